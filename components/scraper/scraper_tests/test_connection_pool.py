@@ -0,0 +1,106 @@
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import src.database_logic as database_logic
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from src.database_logic import ConnectionPool
+
+
+class FakeInfo:
+    transaction_status = TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.info = FakeInfo()
+
+    def close(self):
+        self.closed = 1
+
+
+def fake_connect(opened):
+    def connect(**kwargs):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+    return connect
+
+
+def test_pool_keeps_returned_connections():
+    """Test that connections returned by concurrent borrowers are reused,
+    not closed once minconn are idle"""
+    opened = []
+    real_connect = database_logic.psycopg2.connect
+    database_logic.psycopg2.connect = fake_connect(opened)
+    try:
+        pool = ConnectionPool(minconn=1, maxconn=4)
+        borrowed = [pool.getconn() for _ in range(4)]
+        for conn in borrowed:
+            pool.putconn(conn)
+
+        again = [pool.getconn() for _ in range(4)]
+        assert len(opened) == 4
+        assert not any(conn.closed for conn in opened)
+        assert set(map(id, again)) == set(map(id, borrowed))
+        for conn in again:
+            pool.putconn(conn)
+        pool.closeall()
+        assert all(conn.closed for conn in opened)
+    finally:
+        database_logic.psycopg2.connect = real_connect
+    print("✓ Pool keeps returned connections")
+
+
+def test_pool_replaces_closed_connections():
+    """Test that a connection returned closed, or marked broken, isn't reused"""
+    opened = []
+    real_connect = database_logic.psycopg2.connect
+    database_logic.psycopg2.connect = fake_connect(opened)
+    try:
+        pool = ConnectionPool(minconn=1, maxconn=2)
+        conn = pool.getconn()
+        conn.close()
+        pool.putconn(conn)
+        conn = pool.getconn()
+        pool.putconn(conn, close=True)
+        assert conn.closed
+
+        fresh = pool.getconn()
+        assert fresh not in (opened[0], opened[1])
+        assert len(opened) == 3
+        pool.putconn(fresh)
+    finally:
+        database_logic.psycopg2.connect = real_connect
+    print("✓ Pool replaces closed connections")
+
+
+def test_pool_waits_for_a_free_connection():
+    """Test that a borrower past maxconn waits, then gets the returned connection"""
+    opened = []
+    real_connect = database_logic.psycopg2.connect
+    database_logic.psycopg2.connect = fake_connect(opened)
+    try:
+        pool = ConnectionPool(minconn=0, maxconn=1, timeout=5)
+        conn = pool.getconn()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+        waiter.start()
+        pool.putconn(conn)
+        waiter.join()
+        assert got == [conn]
+        assert len(opened) == 1
+    finally:
+        database_logic.psycopg2.connect = real_connect
+    print("✓ Pool waits for a free connection")
+
+if __name__ == "__main__":
+    test_pool_keeps_returned_connections()
+    test_pool_replaces_closed_connections()
+    test_pool_waits_for_a_free_connection()
+    print("\n✓✓✓ All ConnectionPool tests passed")
@@ -0,0 +1,172 @@
+import datetime
+import os
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.database_logic import MIGRATIONS, ConnectionPool, PropertyDatabase
+
+# A throwaway Postgres to migrate, e.g. "host=localhost user=postgres dbname=postgres".
+# Each test works in its own schema and drops it afterwards.
+DSN = os.getenv("SCRAPER_TEST_DSN")
+
+pytestmark = pytest.mark.skipif(not DSN, reason="SCRAPER_TEST_DSN not set")
+
+NOW = datetime.datetime.now()
+
+
+def make_database():
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    pool = ConnectionPool(1, 4, dsn=DSN, options=f"-c search_path={schema}")
+    db = PropertyDatabase(pool=pool)
+    with db.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    return db, schema
+
+
+def drop_database(db, schema):
+    with db.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    db.pool.closeall()
+
+
+def listing(property_id, price=500.0, scraped_at=NOW):
+    property_data = {
+        "id": property_id,
+        "price": price,
+        "description": f"Listing {property_id}",
+        "bedrooms": 2,
+        "bathrooms": 1,
+        "carspaces": 1,
+        "property_type": "house",
+        "state": "NSW",
+        "postcode": "2000",
+    }
+    return property_data, {"scraped_at": scraped_at, "job_url": f"http://test.com/{property_id}"}
+
+
+def test_migrate_applies_every_migration_once():
+    """Test that migrate applies all migrations, then nothing on a rerun"""
+    db, schema = make_database()
+    try:
+        assert db.migrate() == [version for version, _, _ in MIGRATIONS]
+        assert db.migrate() == []
+        print("✓ Migrations apply once")
+    finally:
+        drop_database(db, schema)
+
+
+def test_concurrent_migrations_apply_each_version_once():
+    """Test that services starting together on a fresh database don't collide"""
+    db, schema = make_database()
+    try:
+        options = f"-c search_path={schema}"
+        starting = [PropertyDatabase(pool=ConnectionPool(1, 2, dsn=DSN, options=options)) for _ in range(4)]
+        barrier = threading.Barrier(len(starting))
+        applied, errors = [], []
+
+        def start(service):
+            barrier.wait()
+            try:
+                applied.extend(service.migrate())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=start, args=(service,)) for service in starting]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for service in starting:
+            service.pool.closeall()
+
+        assert errors == []
+        assert sorted(applied) == [version for version, _, _ in MIGRATIONS]
+        print("✓ Concurrent migrations apply each version once")
+    finally:
+        drop_database(db, schema)
+
+
+def test_upsert_counts_and_stats():
+    """Test upsert counts and that get_stats follows upserts and compaction"""
+    db, schema = make_database()
+    try:
+        db.migrate()
+        counts = db.upsert_properties([listing("1", 400.0), listing("2", 600.0), listing("3", None)])
+        assert counts == {"created": 3, "updated": 0, "unchanged": 0}
+
+        later = NOW + datetime.timedelta(minutes=1)
+        counts = db.upsert_properties([
+            listing("1", 400.0, later),
+            listing("2", 800.0, later),
+            listing("3", None, later),
+        ])
+        assert counts == {"created": 0, "updated": 1, "unchanged": 2}
+
+        stats = db.get_stats()
+        assert stats["total_properties"] == 3
+        assert stats["total_scrapes"] == 6
+        assert stats["average_price"] == 600.0
+        # new listings and the changed one wait to be vectorised
+        assert stats["vectorisation_backlog"] == 4
+
+        totals = db.compact_scrape_history(progress=None)
+        assert totals == {"properties": 3, "deleted": 3}
+        stats = db.get_stats()
+        assert stats["total_scrapes"] == 3
+        # each kept scrape is re-queued if a deleted one was unvectorised
+        assert stats["vectorisation_backlog"] == 3
+        print("✓ Upsert counts and stats are correct")
+    finally:
+        drop_database(db, schema)
+
+
+def test_partitions_and_retention():
+    """Test that old scrapes leave the default partition and expire"""
+    db, schema = make_database()
+    try:
+        db.migrate()
+        old = NOW - datetime.timedelta(days=200)
+        db.upsert_properties([listing("1", scraped_at=old), listing("2", scraped_at=old)])
+        db.upsert_properties([listing("3", scraped_at=NOW)])
+
+        with db.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM scrape_history_default")
+            assert cur.fetchone()[0] == 2
+
+        db.maintain_partitions()
+        with db.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM scrape_history_default")
+            assert cur.fetchone()[0] == 0
+            cur.execute("SELECT COUNT(*) FROM scrape_history")
+            assert cur.fetchone()[0] == 3
+
+        dropped = db.apply_retention(keep_months=2)
+        assert f"scrape_history_p{old:%Y%m}" in dropped
+
+        stats = db.get_stats()
+        assert stats["total_properties"] == 3
+        assert stats["total_scrapes"] == 1
+        assert stats["vectorisation_backlog"] == 1
+        with db.cursor() as cur:
+            cur.execute("SELECT property_id, scrape_count FROM property_scrape_summary ORDER BY property_id")
+            assert cur.fetchall() == [("1", 1), ("2", 1)]
+        print("✓ Partitions and retention keep stats correct")
+    finally:
+        drop_database(db, schema)
+
+if __name__ == "__main__":
+    if not DSN:
+        print("SCRAPER_TEST_DSN not set, skipping database migration tests")
+        sys.exit(0)
+    test_migrate_applies_every_migration_once()
+    test_concurrent_migrations_apply_each_version_once()
+    test_upsert_counts_and_stats()
+    test_partitions_and_retention()
+    print("\n✓✓✓ All database migration tests passed")
@@ -0,0 +1,106 @@
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.scrape_scheduler import DriverPool
+from src.seed_database import discover_listings, extract_listing_pages, search_urls
+
+CONFIG = {
+    "base_url": "https://test.com/",
+    "target_property_type": ["rent/?suburb="],
+    "location_tags": "sydney-nsw-2000,pyrmont-nsw-2009",
+    "listing_card_selector": "a.address",
+    "pagination": {"param": "page", "max_pages": 5},
+}
+
+# search URL -> listing hrefs on each results page
+RESULTS = {
+    "https://test.com/rent/?suburb=sydney-nsw-2000": [["/a", "/b", "/a"], ["/c"]],
+    "https://test.com/rent/?suburb=pyrmont-nsw-2009": [["/d"]],
+}
+
+
+class FakeDriver:
+    def __init__(self):
+        self.url = None
+        self.gets = []
+        self.scripts = 0
+        self.quit_called = False
+
+    def get(self, url):
+        self.url = url
+        self.gets.append(url)
+
+    def find_element(self, by, value):
+        return object()
+
+    def execute_script(self, script, selector):
+        self.scripts += 1
+        base, _, page = self.url.partition("&page=")
+        pages = RESULTS.get(base, [])
+        index = int(page or 1) - 1
+        # past the last page the site repeats it
+        hrefs = pages[min(index, len(pages) - 1)] if pages else []
+        return ["https://test.com" + href for href in hrefs]
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_search_urls_split_suburbs():
+    """Test that every suburb gets its own search URL"""
+    assert search_urls(CONFIG) == list(RESULTS)
+    print("✓ One search URL per suburb")
+
+def test_extract_listing_pages_follows_pagination():
+    """Test that pages are followed until they stop adding listings, one script call per page"""
+    driver = FakeDriver()
+    listings = extract_listing_pages(driver, ["https://test.com/rent/?suburb=sydney-nsw-2000"], CONFIG)
+
+    assert listings == ["https://test.com/a", "https://test.com/b", "https://test.com/c"]
+    assert driver.gets == [
+        "https://test.com/rent/?suburb=sydney-nsw-2000",
+        "https://test.com/rent/?suburb=sydney-nsw-2000&page=2",
+        "https://test.com/rent/?suburb=sydney-nsw-2000&page=3",
+    ]
+    assert driver.scripts == 3
+    print("✓ Pagination followed with one round trip per page")
+
+def test_extract_listing_pages_respects_max_pages():
+    """Test that pagination stops at max_pages"""
+    driver = FakeDriver()
+    config = {**CONFIG, "pagination": {"max_pages": 1}}
+    listings = extract_listing_pages(driver, ["https://test.com/rent/?suburb=sydney-nsw-2000"], config)
+
+    assert listings == ["https://test.com/a", "https://test.com/b"]
+    assert len(driver.gets) == 1
+    print("✓ Pagination depth is capped")
+
+def test_discover_listings_runs_searches_concurrently():
+    """Test that searches are spread over pooled drivers and results merged"""
+    drivers = []
+    lock = threading.Lock()
+
+    def factory():
+        driver = FakeDriver()
+        with lock:
+            drivers.append(driver)
+        return driver
+
+    with DriverPool(2, driver_factory=factory) as pool:
+        listings = discover_listings(pool, search_urls(CONFIG) + search_urls(CONFIG), CONFIG, workers=2)
+
+    assert sorted(listings) == [f"https://test.com/{c}" for c in "abcd"]
+    assert 1 <= len(drivers) <= 2
+    assert all(driver.quit_called for driver in drivers)
+    print("✓ Discovery runs searches on pooled drivers")
+
+if __name__ == "__main__":
+    test_search_urls_split_suburbs()
+    test_extract_listing_pages_follows_pagination()
+    test_extract_listing_pages_respects_max_pages()
+    test_discover_listings_runs_searches_concurrently()
+    print("\n✓✓✓ All discovery tests passed")
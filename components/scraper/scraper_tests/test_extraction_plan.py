@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import src.scraping_util as scraping_util
+from src.extraction_plan import ExtractionPlan, MissingPath
+
+FIELDS = {
+    "id": {"keys": ["componentProps", "propertyId"]},
+    "bedrooms": {"keys": ["componentProps", "profiles", 0, "bedrooms"]},
+    "address": {"keys": ["layoutProps", "address"]},
+}
+
+PAGE = {
+    "componentProps": {
+        "propertyId": 2019,
+        "profiles": [{"bedrooms": 2}],
+    },
+    "layoutProps": {"address": "1 George St, Sydney NSW 2000"},
+}
+
+def test_plan_extracts_fields():
+    """Test that a compiled plan pulls nested fields, including list indexes"""
+    plan = ExtractionPlan(FIELDS)
+    values, missing = plan.apply(PAGE)
+
+    assert values == {"id": 2019, "bedrooms": 2, "address": "1 George St, Sydney NSW 2000"}
+    assert missing == []
+    print("✓ Plan extracts nested fields")
+
+def test_plan_is_reusable():
+    """Test that applying a plan changes neither the plan nor the config"""
+    config = {"fields": {"id": {"keys": ["componentProps", "propertyId"]}}}
+    plan = ExtractionPlan.from_config(config)
+
+    for _ in range(3):
+        assert plan.apply(PAGE)[0] == {"id": 2019}
+    assert config["fields"]["id"]["keys"] == ["componentProps", "propertyId"]
+    print("✓ Plan can be applied repeatedly")
+
+def test_plan_reports_missing_paths():
+    """Test that missing keys are reported with the field, path and depth"""
+    plan = ExtractionPlan({
+        "price": {"keys": ["componentProps", "priceDetails", "price"]},
+        "carspaces": {"keys": ["componentProps", "profiles", 3, "carspaces"]},
+    })
+    values, missing = plan.apply(PAGE)
+
+    assert values == {"price": None, "carspaces": None}
+    assert missing == [
+        MissingPath("price", ("componentProps", "priceDetails", "price"), 1, "missing key"),
+        MissingPath("carspaces", ("componentProps", "profiles", 3, "carspaces"), 2, "index out of range"),
+    ]
+    assert str(missing[0]) == "price: missing key at ['componentProps']['priceDetails']"
+    print("✓ Missing paths are reported")
+
+def test_plan_mixes_int_and_string_keys():
+    """Test that string indexes work on lists and int keys on JSON objects"""
+    plan = ExtractionPlan({
+        "first": {"keys": ["items", "0"]},
+        "named": {"keys": ["by_index", 1]},
+    })
+    values, missing = plan.apply({"items": ["a", "b"], "by_index": {"1": "b"}})
+
+    assert values == {"first": "a", "named": "b"}
+    assert missing == []
+    print("✓ Int and string keys are interchangeable")
+
+def test_plan_decodes_nested_json_strings():
+    """Test that a path can step into a JSON document stored as a string"""
+    plan = ExtractionPlan({"bedrooms": {"keys": ["details", "bedrooms"]}})
+
+    assert plan.apply({"details": '{"bedrooms": 3}'}) == ({"bedrooms": 3}, [])
+    print("✓ Nested JSON strings are decoded on the way")
+
+def test_plan_decodes_shared_prefix_once():
+    """Test that fields under the same embedded JSON string share one decode"""
+    calls = []
+    real_loads = scraping_util.loads
+    scraping_util.loads = lambda text: calls.append(text) or real_loads(text)
+    try:
+        plan = ExtractionPlan({
+            "bedrooms": {"keys": ["details", "bedrooms"]},
+            "bathrooms": {"keys": ["details", "bathrooms"]},
+        })
+        values, _ = plan.apply({"details": '{"bedrooms": 3, "bathrooms": 2}', "blurb": '{"unused": 1}'})
+    finally:
+        scraping_util.loads = real_loads
+
+    assert values == {"bedrooms": 3, "bathrooms": 2}
+    assert calls == ['{"bedrooms": 3, "bathrooms": 2}']
+    print("✓ Shared prefixes are decoded once")
+
+if __name__ == "__main__":
+    test_plan_extracts_fields()
+    test_plan_is_reusable()
+    test_plan_reports_missing_paths()
+    test_plan_mixes_int_and_string_keys()
+    test_plan_decodes_nested_json_strings()
+    test_plan_decodes_shared_prefix_once()
+    print("\n✓✓✓ All ExtractionPlan tests passed")
@@ -8,7 +8,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 print(str(Path(__file__).parent.parent))
 
-from src.seed_database import TargetListing
+from src.seed_database import TargetListing, transform_batch
 
 def test_target_listing_initialization():
     """Test that TargetListing initializes correctly"""
@@ -114,8 +114,98 @@ def test_transform_handles_missing_values():
     assert result["property_data"]["postcode"] == ""
     print("✓ Transform handles missing values")
 
+def test_transform_batch_gives_expected_records():
+    """Test that a batch transform cleans each row into its property record"""
+    rows = [
+        {
+            "id": 101,
+            "price": "650",
+            "description": "Bright. Spacious, quiet",
+            "address": "9 Harris St., Pyrmont NSW 2009",
+            "bedrooms": 2,
+            "bathrooms": "1",
+            "carspaces": None,
+            "property_type": "House  "
+        },
+        {
+            "id": "test456",
+            "price": None,
+            "description": None,
+            "address": "Invalid Address",
+            "bedrooms": None,
+            "bathrooms": None,
+            "carspaces": None,
+            "property_type": None
+        },
+    ]
+
+    records = transform_batch(rows)
+
+    assert records == [
+        {
+            "id": "101",
+            "price": 650.0,
+            "description": "Bright. Spacious, quiet",
+            "address": "9 Harris St Pyrmont Nsw 2009",
+            "bedrooms": 2,
+            "property_type": "house",
+            "bathrooms": 1,
+            "carspaces": 0,
+            "state": "NSW",
+            "postcode": "2009",
+        },
+        {
+            "id": "test456",
+            "price": 0.0,
+            "description": "",
+            "address": "Invalid Address",
+            "bedrooms": 0,
+            "property_type": "",
+            "bathrooms": 0,
+            "carspaces": 0,
+            "state": "",
+            "postcode": "",
+        },
+    ]
+    # plain Python values, ready for psycopg2
+    assert type(records[0]["bedrooms"]) is int
+    assert type(records[0]["price"]) is float
+    assert transform_batch([]) == []
+    print("✓ Batch transform gives the expected records")
+
+def test_transform_rejects_values_that_are_not_numbers():
+    """Test that a non-numeric price or count rejects the listing instead of storing 0"""
+    good = {"id": "1", "price": "650", "address": "9 Harris St, Pyrmont NSW 2009"}
+    rows = [
+        good,
+        {**good, "id": "2", "price": "$650 pw"},
+        {**good, "id": "3", "bedrooms": {"value": 2}},
+    ]
+
+    rejected = {}
+    records = transform_batch(rows, rejected)
+
+    assert records[0]["price"] == 650.0
+    assert records[1] is None and records[2] is None
+    assert rejected == {1: "price '$650 pw' isn't a number", 2: "bedrooms {'value': 2} isn't a number"}
+
+    config = {"site": "domain", "from_script": "true", "fields": {k: {"keys": [k]} for k in good}}
+    listing = TargetListing(config)
+    listing.job_url = "http://test.com/2"
+    listing.fields = dict(rows[1])
+    try:
+        listing.transform()
+    except ValueError as e:
+        assert "$650 pw" in str(e)
+        assert listing.final_data is None
+        print("✓ Transform rejects values that aren't numbers")
+        return
+    raise AssertionError("Expected ValueError for a non-numeric price")
+
 if __name__ == "__main__":
     test_target_listing_initialization()
     test_transform_extracts_state_and_postcode()
     test_transform_handles_missing_values()
+    test_transform_batch_gives_expected_records()
+    test_transform_rejects_values_that_are_not_numbers()
     print("\n✓✓✓ All TargetListing tests passed")
\ No newline at end of file
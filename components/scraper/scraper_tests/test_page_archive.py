@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import src.page_archive as page_archive
+from src.page_archive import PageArchive
+from src.seed_database import replay_archive
+
+PAYLOAD = json.dumps({"props": {"pageProps": {"componentProps": {"propertyId": 2019, "description": ["Sunny"]}}}})
+
+CONFIG = {
+    "site": "domain",
+    "from_script": "true",
+    "global_tags": ["props", "pageProps"],
+    "fields": {
+        "id": {"keys": ["componentProps", "propertyId"]},
+        "price": {"keys": ["componentProps", "price"]},
+        "description": {"keys": ["componentProps", "description"]},
+        "address": {"keys": ["componentProps", "address"]},
+        "bedrooms": {"keys": ["componentProps", "bedrooms"]},
+        "bathrooms": {"keys": ["componentProps", "bathrooms"]},
+        "carspaces": {"keys": ["componentProps", "carspaces"]},
+        "property_type": {"keys": ["componentProps", "propertyType"]},
+    }
+}
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.batches = []
+
+    def upsert_properties(self, batch, log_unchanged=True):
+        self.batches.append((list(batch), log_unchanged))
+        return {"created": len(batch), "updated": 0, "unchanged": 0}
+
+
+def test_archive_round_trip_and_dedupe():
+    """Test that payloads come back intact and identical payloads are stored once"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = PageArchive(root)
+        first = archive.store("domain", "http://test.com/1", PAYLOAD, "2026-09-01T10:00:00")
+        second = archive.store("domain", "http://test.com/2", PAYLOAD, "2026-09-02T10:00:00")
+
+        assert first == second
+        assert archive.load(first) == PAYLOAD
+        objects = [name for _, _, names in os.walk(os.path.join(root, "objects")) for name in names]
+        assert len(objects) == 1
+        assert [e["url"] for e in archive.entries()] == ["http://test.com/1", "http://test.com/2"]
+    print("✓ Archive round-trips and de-duplicates payloads")
+
+def test_archive_gzip_fallback():
+    """Test that payloads are gzipped when zstandard isn't installed"""
+    real_zstandard = page_archive.zstandard
+    page_archive.zstandard = None
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            archive = PageArchive(root)
+            digest = archive.store("domain", "http://test.com/1", PAYLOAD)
+
+            assert archive._find_object(digest).endswith(".json.gz")
+            assert archive.load(digest) == PAYLOAD
+    finally:
+        page_archive.zstandard = real_zstandard
+    print("✓ gzip used without zstandard")
+
+def test_latest_entries_window():
+    """Test that only each URL's newest fetch is replayed, and only if it is in the window"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = PageArchive(root)
+        archive.store("domain", "http://test.com/1", "{}", "2026-08-15T00:00:00")
+        archive.store("domain", "http://test.com/1", "[]", "2026-09-15T00:00:00")
+        archive.store("domain", "http://test.com/2", "{}", "2026-08-20T00:00:00")
+        archive.store("domain", "http://test.com/3", "{}", "2026-10-02T00:00:00")
+
+        august = archive.latest_entries("2026-08-01", "2026-09-01")
+        everything = archive.latest_entries()
+        september = archive.entries(since="2026-09-01", until="2026-10-01")
+
+        assert [e["url"] for e in august] == ["http://test.com/2"]
+        assert sorted((e["url"], e["fetched_at"][:10]) for e in everything) == [
+            ("http://test.com/1", "2026-09-15"),
+            ("http://test.com/2", "2026-08-20"),
+            ("http://test.com/3", "2026-10-02"),
+        ]
+        assert [e["url"] for e in september] == ["http://test.com/1"]
+    print("✓ Replay window picks the latest fetch of each URL")
+
+def test_replay_archive_reextracts_without_browser():
+    """Test that archived pages are extracted, transformed and loaded in worker processes"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = PageArchive(root)
+        for i in range(5):
+            payload = PAYLOAD.replace("2019", str(2000 + i))
+            archive.store("domain", f"http://test.com/{i}", payload, f"2026-09-0{i + 1}T00:00:00")
+        archive.store("other-site", "http://other.com/1", PAYLOAD)
+
+        db = FakeDatabase()
+        totals = replay_archive(db, archive, {"domain": CONFIG}, workers=2, chunk_size=2)
+
+    loaded = [pair for batch, _ in db.batches for pair in batch]
+    assert totals["created"] == 5
+    assert len(db.batches) == 3
+    assert all(log_unchanged is False for _, log_unchanged in db.batches)
+    assert sorted(data["id"] for data, _ in loaded) == [str(2000 + i) for i in range(5)]
+    assert loaded[0][0]["description"] == "Sunny"
+    assert loaded[0][1] == {"scraped_at": "2026-09-01T00:00:00", "job_url": "http://test.com/0"}
+    print("✓ Replay re-extracts archived pages")
+
+if __name__ == "__main__":
+    test_archive_round_trip_and_dedupe()
+    test_archive_gzip_fallback()
+    test_latest_entries_window()
+    test_replay_archive_reextracts_without_browser()
+    print("\n✓✓✓ All PageArchive tests passed")
@@ -0,0 +1,61 @@
+import datetime
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.scrape_cache import ScrapeCache
+
+NOW = datetime.datetime(2026, 1, 2, 12, 0, 0)
+TTL = datetime.timedelta(hours=24)
+
+def test_cache_skips_fresh_listings():
+    """Test that only listings scraped outside the TTL are returned as stale"""
+    cache = ScrapeCache("unused.json")
+    cache.record("http://test.com/fresh", "1", (NOW - datetime.timedelta(hours=1)).isoformat())
+    cache.record("http://test.com/old", "2", (NOW - datetime.timedelta(days=3)).isoformat())
+
+    stale = cache.filter_stale(["http://test.com/fresh", "http://test.com/old", "http://test.com/new"], TTL, now=NOW)
+
+    assert stale == ["http://test.com/old", "http://test.com/new"]
+    assert cache.is_fresh_property("1", TTL, now=NOW)
+    assert not cache.is_fresh_property("2", TTL, now=NOW)
+    print("✓ Cache skips fresh listings")
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays within max_entries by dropping the LRU entry"""
+    cache = ScrapeCache("unused.json", max_entries=2)
+    scraped_at = NOW.isoformat()
+    cache.record("a", "1", scraped_at)
+    cache.record("b", "2", scraped_at)
+    cache.is_fresh("a", TTL, now=NOW)  # touch a so b is least recently used
+    cache.record("c", "3", scraped_at)
+
+    assert len(cache) == 2
+    assert cache.is_fresh("a", TTL, now=NOW)
+    assert not cache.is_fresh("b", TTL, now=NOW)
+    assert not cache.is_fresh_property("2", TTL, now=NOW)
+    print("✓ Cache evicts least recently used entries")
+
+def test_cache_persists_to_disk():
+    """Test that a saved cache is loaded back in the same order"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scrape_cache.json")
+        cache = ScrapeCache(path)
+        cache.record("a", "1", NOW.isoformat())
+        cache.save()
+
+        reloaded = ScrapeCache(path).load()
+
+        assert reloaded.is_fresh("a", TTL, now=NOW)
+        assert reloaded.is_fresh_property("1", TTL, now=NOW)
+    print("✓ Cache persists to disk")
+
+if __name__ == "__main__":
+    test_cache_skips_fresh_listings()
+    test_cache_evicts_least_recently_used()
+    test_cache_persists_to_disk()
+    print("\n✓✓✓ All ScrapeCache tests passed")
@@ -0,0 +1,128 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from src.scrape_scheduler import DriverPool, ScrapeScheduler
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_scheduler_runs_every_job_and_quits_drivers():
+    """Test that every job is handled and all drivers are quit afterwards"""
+    drivers = []
+
+    def factory():
+        driver = FakeDriver()
+        drivers.append(driver)
+        return driver
+
+    scheduler = ScrapeScheduler(workers=3, driver_factory=factory)
+    jobs = [("domain", f"http://test.com/{i}") for i in range(10)]
+
+    results = list(scheduler.run(jobs, lambda driver, site, url: url.upper()))
+
+    assert sorted(r[2] for r in results) == sorted(url.upper() for _, url in jobs)
+    assert all(error is None for *_, error in results)
+    assert 1 <= len(drivers) <= 3
+    assert all(driver.quit_called for driver in drivers)
+    print("✓ Scheduler runs every job and quits drivers")
+
+
+def test_scheduler_respects_site_limits():
+    """Test that no more than the site limit of jobs run at once"""
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def handler(driver, site, url):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    scheduler = ScrapeScheduler(workers=4, site_limits={"domain": 2}, driver_factory=FakeDriver)
+    jobs = [("domain", f"http://test.com/{i}") for i in range(8)]
+    list(scheduler.run(jobs, handler))
+
+    assert running["peak"] == 2
+    print("✓ Scheduler respects per-site limits")
+
+
+def test_scheduler_reports_job_errors():
+    """Test that a failing job is reported rather than stopping the run"""
+    def handler(driver, site, url):
+        if url.endswith("bad"):
+            raise ValueError("broken page")
+        return url
+
+    scheduler = ScrapeScheduler(workers=2, driver_factory=FakeDriver)
+    results = list(scheduler.run([("domain", "good"), ("domain", "bad")], handler))
+
+    errors = {url: error for _, url, _, error in results}
+    assert errors["good"] is None
+    assert isinstance(errors["bad"], ValueError)
+    print("✓ Scheduler reports job errors")
+
+
+def test_scheduler_replaces_crashed_driver():
+    """Test that a driver that dies mid-run is quit and replaced"""
+    drivers = []
+
+    def factory():
+        driver = FakeDriver()
+        drivers.append(driver)
+        return driver
+
+    def handler(driver, site, url):
+        # the first browser crashes on its third page
+        if driver is drivers[0] and url.endswith("/2"):
+            driver.crashed = True
+        if getattr(driver, "crashed", False):
+            raise WebDriverException("invalid session id")
+        return url
+
+    scheduler = ScrapeScheduler(workers=1, driver_factory=factory)
+    jobs = [("domain", f"http://test.com/{i}") for i in range(6)]
+    results = list(scheduler.run(jobs, handler))
+
+    errors = {url: error for _, url, _, error in results}
+    assert isinstance(errors["http://test.com/2"], WebDriverException)
+    assert all(error is None for url, error in errors.items() if url != "http://test.com/2")
+    assert len(drivers) == 2
+    assert all(driver.quit_called for driver in drivers)
+    print("✓ Scheduler replaces a crashed driver")
+
+
+def test_pool_keeps_driver_after_page_error():
+    """Test that a page timeout doesn't cost the driver"""
+    pool = DriverPool(size=1, driver_factory=FakeDriver)
+    try:
+        with pool.session():
+            raise TimeoutException("script never loaded")
+    except TimeoutException:
+        pass
+    with pool.session() as driver:
+        assert not driver.quit_called
+    assert len(pool._drivers) == 1
+    pool.close()
+    print("✓ Pool keeps a driver after a page error")
+
+if __name__ == "__main__":
+    test_scheduler_runs_every_job_and_quits_drivers()
+    test_scheduler_respects_site_limits()
+    test_scheduler_reports_job_errors()
+    test_scheduler_replaces_crashed_driver()
+    test_pool_keeps_driver_after_page_error()
+    print("\n✓✓✓ All ScrapeScheduler tests passed")
@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.scraping_util import (
+    blocked_url_patterns,
+    extract_script_from_html,
+    follow_path,
+    retrieve_from_script,
+)
+
+PAGE = """
+<html><head><title>Listing</title></head><body>
+<script src="/static/app.js"></script>
+<script id="__NEXT_DATA__" type="application/json">{"props": {"pageProps": {"componentProps": {"propertyId": 2019}}}}</script>
+</body></html>
+"""
+
+def test_extract_script_from_html():
+    """Test that the script JSON is pulled out of raw HTML and global tags applied"""
+    data = extract_script_from_html(PAGE, "__NEXT_DATA__", ["props", "pageProps"])
+
+    assert data == {"componentProps": {"propertyId": 2019}}
+    print("✓ Script extracted from raw HTML")
+
+def test_extract_script_from_html_missing_script():
+    """Test that a page without the script returns None"""
+    assert extract_script_from_html("<html><body></body></html>", "__NEXT_DATA__") is None
+    print("✓ Missing script returns None")
+
+def test_follow_path_decodes_only_along_path():
+    """Test that embedded JSON is decoded where the path steps into it and nowhere else"""
+    data = {"listing": '{"profiles": [{"bedrooms": 2}]}', "tracking": '{"id": 7}'}
+
+    assert follow_path(data, ["listing", "profiles", "0", "bedrooms"]) == 2
+    assert follow_path(data, ["tracking"]) == '{"id": 7}'
+    print("✓ follow_path decodes lazily")
+
+class FakeDriver:
+    """Records DevTools calls and serves the script once it has 'loaded'"""
+
+    def __init__(self, polls_until_ready=0):
+        self.cdp_calls = []
+        self.polls_until_ready = polls_until_ready
+        self.polls = 0
+
+    def get(self, url):
+        self.url = url
+
+    def execute_script(self, script, script_name):
+        self.polls += 1
+        if self.polls <= self.polls_until_ready:
+            return None
+        return '{"props": {"pageProps": {"componentProps": {"propertyId": 2019}}}}'
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append((cmd, params))
+
+def test_retrieve_from_script_returns_when_script_present():
+    """Test that the script is read as soon as it appears, with no fixed sleep"""
+    driver = FakeDriver(polls_until_ready=2)
+    data = retrieve_from_script(driver, "http://test.com", "__NEXT_DATA__", ["props", "pageProps"], timeout=5)
+
+    assert data == {"componentProps": {"propertyId": 2019}}
+    assert driver.polls == 3
+    print("✓ Script read as soon as it is present")
+
+def test_page_profile_blocks_urls_once_per_driver():
+    """Test that a page profile is sent to DevTools once and reused after"""
+    profile = {"block": ["fonts", "ads"], "block_urls": ["*tracker.example*"]}
+    driver = FakeDriver()
+
+    retrieve_from_script(driver, "http://test.com/1", "__NEXT_DATA__", page_profile=profile)
+    retrieve_from_script(driver, "http://test.com/2", "__NEXT_DATA__", page_profile=profile)
+
+    assert [cmd for cmd, _ in driver.cdp_calls] == ["Network.enable", "Network.setBlockedURLs"]
+    urls = driver.cdp_calls[1][1]["urls"]
+    assert "*.woff2*" in urls and "*doubleclick.net*" in urls and "*tracker.example*" in urls
+    print("✓ Page profile applied once per driver")
+
+def test_blocked_url_patterns_rejects_unknown_groups():
+    """Test that a typo in a page profile is caught"""
+    try:
+        blocked_url_patterns({"block": ["fonts", "imgs"]})
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Unknown block groups are rejected")
+
+if __name__ == "__main__":
+    test_extract_script_from_html()
+    test_extract_script_from_html_missing_script()
+    test_follow_path_decodes_only_along_path()
+    test_retrieve_from_script_returns_when_script_present()
+    test_page_profile_blocks_urls_once_per_driver()
+    test_blocked_url_patterns_rejects_unknown_groups()
+    print("\n✓✓✓ All scraping_util tests passed")
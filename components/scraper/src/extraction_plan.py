@@ -0,0 +1,128 @@
+from src.scraping_util import as_container, lookup
+
+
+class MissingPath:
+    """A configured field whose path isn't in a page's data.
+
+    `depth` is how many keys of `path` resolved before the lookup failed,
+    so path[depth] is the key that wasn't there.
+    """
+
+    __slots__ = ("field", "path", "depth", "reason")
+
+    def __init__(self, field: str, path: tuple, depth: int, reason: str):
+        self.field = field
+        self.path = path
+        self.depth = depth
+        self.reason = reason
+
+    def __eq__(self, other):
+        return isinstance(other, MissingPath) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"MissingPath({self.field!r}, {self.path!r}, depth={self.depth}, reason={self.reason!r})"
+
+    def __str__(self):
+        resolved = "".join(f"[{key!r}]" for key in self.path[:self.depth])
+        return f"{self.field}: {self.reason} at {resolved}[{self.path[self.depth]!r}]"
+
+    def as_dict(self):
+        return {"field": self.field, "path": list(self.path), "depth": self.depth, "reason": self.reason}
+
+
+def _compile_trie(paths):
+    """Merge field paths into a trie of (fields, children) nodes, so
+    fields sharing a prefix are resolved, and decoded, together"""
+    root = ([], {})
+    for field, keys in paths:
+        node = root
+        for key in keys:
+            # 0 and "0" may resolve the same, but keep the paths apart
+            node = node[1].setdefault((type(key), key), ([], {}))
+        node[0].append(field)
+
+    def freeze(node):
+        fields, children = node
+        return tuple(fields), tuple((key, freeze(child)) for (_, key), child in children.items())
+    return freeze(root)
+
+
+class ExtractionPlan:
+    """A site's field paths, compiled once and applied to every page.
+
+    Paths are merged into a trie, so each shared prefix is walked once per
+    page and an embedded JSON string on it is decoded once. Nothing off the
+    paths is decoded. Applying the plan never changes it or the page data,
+    so one plan can be shared by every listing (and thread) of a site.
+    """
+
+    __slots__ = ("_paths", "_order", "_trie")
+
+    def __init__(self, fields: dict):
+        paths = []
+        for field, spec in fields.items():
+            keys = tuple(spec["keys"])
+            if not keys:
+                raise ValueError(f"Field {field!r} has no keys")
+            for key in keys:
+                if not isinstance(key, (str, int)) or isinstance(key, bool):
+                    raise ValueError(f"Field {field!r} has an invalid key {key!r}")
+            paths.append((field, keys))
+        object.__setattr__(self, "_paths", tuple(paths))
+        object.__setattr__(self, "_order", {field: i for i, (field, _) in enumerate(paths)})
+        object.__setattr__(self, "_trie", _compile_trie(paths))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ExtractionPlan is immutable")
+
+    @classmethod
+    def from_config(cls, config: dict):
+        return cls(config["fields"])
+
+    @property
+    def fields(self):
+        return tuple(field for field, _ in self._paths)
+
+    def paths(self):
+        return dict(self._paths)
+
+    def apply(self, data):
+        """Resolve every field against data.
+
+        Returns (values, missing): values maps every field to what was found,
+        or None, and missing lists a MissingPath for each field not found.
+        """
+        values = dict.fromkeys(self.fields)
+        missing = []
+        self._resolve(self._trie, data, 0, values, missing)
+        missing.sort(key=lambda m: self._order[m.field])
+        return values, missing
+
+    def _resolve(self, node, value, depth, values, missing):
+        fields, children = node
+        for field in fields:
+            values[field] = value
+        if not children:
+            return
+
+        try:
+            container = as_container(value)
+        except LookupError as e:
+            for _, child in children:
+                self._report(child, depth, str(e), missing)
+            return
+
+        for key, child in children:
+            try:
+                child_value = lookup(container, key)
+            except LookupError as e:
+                self._report(child, depth, str(e), missing)
+                continue
+            self._resolve(child, child_value, depth + 1, values, missing)
+
+    def _report(self, node, depth, reason, missing):
+        fields, children = node
+        for field in fields:
+            missing.append(MissingPath(field, self._paths[self._order[field]][1], depth, reason))
+        for _, child in children:
+            self._report(child, depth, reason, missing)
@@ -0,0 +1,129 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import zstandard
+except ImportError:  # optional, smaller and faster than gzip
+    zstandard = None
+
+
+def _timestamp(value):
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromisoformat(value)
+
+
+class PageArchive:
+    """Local, content-addressed archive of raw page payloads.
+
+    Each payload (e.g. a listing's __NEXT_DATA__ text) is compressed, with
+    zstd when the zstandard package is installed and gzip otherwise, and
+    stored once under its sha256 in objects/. Which URL served which payload
+    when goes in a JSON-lines index per month, so re-fetching an unchanged
+    page only costs an index line.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str, extension: str):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.json.{extension}")
+
+    def _index_path(self, month: str):
+        return os.path.join(self.root, "index", f"{month}.jsonl")
+
+    def store(self, site: str, url: str, payload: str, fetched_at: str = None):
+        """Archive one fetched payload and return its digest"""
+        fetched_at = fetched_at or datetime.datetime.now().isoformat()
+        data = payload.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        if not self._find_object(digest):
+            if zstandard is not None:
+                path, compressed = self._object_path(digest, "zst"), zstandard.ZstdCompressor(level=10).compress(data)
+            else:
+                path, compressed = self._object_path(digest, "gz"), gzip.compress(data, compresslevel=6)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # unique temp name so concurrent writers of the same payload don't collide
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(compressed)
+            os.replace(tmp_path, path)
+
+        entry = {"site": site, "url": url, "fetched_at": fetched_at, "sha256": digest}
+        index_path = self._index_path(fetched_at[:7])
+        with self._lock:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(index_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+        return digest
+
+    def _find_object(self, digest: str):
+        for extension in ("zst", "gz"):
+            path = self._object_path(digest, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def load(self, digest: str):
+        """Return the payload text stored under digest"""
+        path = self._find_object(digest)
+        if path is None:
+            raise KeyError(f"No archived payload {digest}")
+        with open(path, "rb") as file:
+            data = file.read()
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"{path} needs the zstandard package to read")
+            return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+        return gzip.decompress(data).decode("utf-8")
+
+    def entries(self, since=None, until=None, site: str = None):
+        """Index entries fetched in [since, until), oldest month first"""
+        since, until = _timestamp(since), _timestamp(until)
+        index_dir = os.path.join(self.root, "index")
+        if not os.path.isdir(index_dir):
+            return
+
+        for name in sorted(os.listdir(index_dir)):
+            month = name[:7]
+            # whole months outside the window are skipped unread
+            if since is not None and month < since.strftime("%Y-%m"):
+                continue
+            if until is not None and month > until.strftime("%Y-%m"):
+                continue
+            with open(os.path.join(index_dir, name), "r", encoding="utf-8") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    fetched_at = _timestamp(entry["fetched_at"])
+                    if since is not None and fetched_at < since:
+                        continue
+                    if until is not None and fetched_at >= until:
+                        continue
+                    if site is not None and entry["site"] != site:
+                        continue
+                    yield entry
+
+    def latest_entries(self, since=None, until=None, site: str = None):
+        """The newest entry of each URL whose newest fetch falls in
+        [since, until). URLs fetched again after `until` are left out, so
+        replaying an old window never rolls a listing back."""
+        latest = {}
+        for entry in self.entries(site=site):
+            current = latest.get(entry["url"])
+            if current is None or _timestamp(entry["fetched_at"]) >= _timestamp(current["fetched_at"]):
+                latest[entry["url"]] = entry
+
+        since, until = _timestamp(since), _timestamp(until)
+        return [
+            entry for entry in latest.values()
+            if (since is None or _timestamp(entry["fetched_at"]) >= since)
+            and (until is None or _timestamp(entry["fetched_at"]) < until)
+        ]
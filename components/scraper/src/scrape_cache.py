@@ -0,0 +1,84 @@
+import datetime
+import json
+import os
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class ScrapeCache:
+    """Persistent record of recently scraped listings.
+
+    Entries are keyed by job URL and also indexed by property ID, kept in
+    least-recently-used order and capped at max_entries. The cache lives
+    in a JSON file so it survives between crawls.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_property = {}
+
+    def load(self):
+        """Read the cache file, if there is one"""
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r") as file:
+                entries = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable scrape cache {self.path}: {e}")
+            return self
+
+        for url, entry in entries:
+            self._put(url, entry)
+        return self
+
+    def save(self):
+        """Atomically write the cache file"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(list(self._entries.items()), file)
+        os.replace(tmp_path, self.path)
+
+    def record(self, url: str, property_id: str, scraped_at: str):
+        """Remember that a listing was scraped"""
+        self._put(url, {"property_id": str(property_id), "scraped_at": scraped_at})
+
+    def is_fresh(self, url: str, ttl: datetime.timedelta, now: datetime.datetime = None):
+        """True if url was scraped within ttl"""
+        entry = self._entries.get(url)
+        if entry is None:
+            return False
+        self._entries.move_to_end(url)
+        return self._age(entry, now) <= ttl
+
+    def is_fresh_property(self, property_id: str, ttl: datetime.timedelta, now: datetime.datetime = None):
+        """True if the property was scraped within ttl, under any URL"""
+        url = self._by_property.get(str(property_id))
+        return url is not None and self.is_fresh(url, ttl, now)
+
+    def filter_stale(self, urls: list, ttl: datetime.timedelta, now: datetime.datetime = None):
+        """Return the urls that haven't been scraped within ttl"""
+        return [url for url in urls if not self.is_fresh(url, ttl, now)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _age(self, entry, now):
+        now = now or datetime.datetime.now()
+        return now - datetime.datetime.fromisoformat(entry["scraped_at"])
+
+    def _put(self, url, entry):
+        old = self._entries.pop(url, None)
+        if old is not None and self._by_property.get(old["property_id"]) == url:
+            del self._by_property[old["property_id"]]
+
+        self._entries[url] = entry
+        self._by_property[entry["property_id"]] = url
+
+        while len(self._entries) > self.max_entries:
+            evicted_url, evicted = self._entries.popitem(last=False)
+            if self._by_property.get(evicted["property_id"]) == evicted_url:
+                del self._by_property[evicted["property_id"]]
@@ -0,0 +1,189 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from src.scraping_util import build_driver
+
+# WebDriverExceptions that are about the page, not the browser; a driver
+# that raised one of these is still fine to reuse
+PAGE_ERRORS = (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+# Put on the idle queue in place of a discarded driver; whoever takes it
+# starts the replacement in the slot the dead driver left
+_REPLACE = object()
+
+
+class DriverPool:
+    """A fixed-size set of browser sessions shared between worker threads.
+
+    Drivers are started lazily, so a pool is never bigger than the work
+    actually needs, and every driver that was started is quit on close().
+    A driver whose session raises a WebDriverException is quit and
+    replaced rather than handed to the next job.
+    """
+
+    def __init__(self, size: int, driver_factory=build_driver):
+        self.size = size
+        self.driver_factory = driver_factory
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        """Borrow a driver for the duration of the block"""
+        driver = self._checkout()
+        broken = False
+        try:
+            yield driver
+        except PAGE_ERRORS:
+            raise
+        except WebDriverException:
+            # crashed browser or invalid session
+            broken = True
+            raise
+        finally:
+            if broken:
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+
+    def _checkout(self):
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            driver = None
+
+        if driver is None:
+            with self._lock:
+                start_new = len(self._drivers) < self.size
+                if start_new:
+                    # reserve the slot before the (slow) browser start
+                    self._drivers.append(None)
+
+            if not start_new:
+                driver = self._idle.get()
+            else:
+                try:
+                    return self._start()
+                except Exception:
+                    with self._lock:
+                        self._drivers.remove(None)
+                    raise
+
+        if driver is _REPLACE:
+            try:
+                return self._start()
+            except Exception:
+                # leave the slot reserved for the next borrower to retry
+                self._idle.put(_REPLACE)
+                raise
+        return driver
+
+    def _start(self):
+        """Start a driver in a slot already reserved with None"""
+        driver = self.driver_factory()
+        with self._lock:
+            self._drivers[self._drivers.index(None)] = driver
+        return driver
+
+    def _discard(self, driver):
+        """Quit a broken driver and free its slot for a replacement"""
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting driver: {e}")
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers[self._drivers.index(driver)] = None
+        self._idle.put(_REPLACE)
+
+    def close(self):
+        """Quit every driver the pool started"""
+        with self._lock:
+            drivers = [d for d in self._drivers if d is not None]
+            self._drivers = []
+            # nothing handed out after close() may be one of these
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error quitting driver: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ScrapeScheduler:
+    """Runs scrape jobs across a pool of browser sessions.
+
+    Jobs are (site, url) pairs pulled from a shared queue by `workers`
+    threads. `site_limits` caps how many jobs for one site run at once.
+    """
+
+    def __init__(self, workers: int = 4, site_limits: dict = None, driver_factory=build_driver):
+        self.workers = workers
+        self.pool = DriverPool(workers, driver_factory=driver_factory)
+        self._site_slots = {
+            site: threading.BoundedSemaphore(limit)
+            for site, limit in (site_limits or {}).items()
+        }
+
+    @contextmanager
+    def _site_slot(self, site):
+        slot = self._site_slots.get(site)
+        if slot is None:
+            yield
+            return
+        with slot:
+            yield
+
+    def _run_job(self, handler, site, url):
+        with self._site_slot(site), self.pool.session() as driver:
+            return handler(driver, site, url)
+
+    def run(self, jobs, handler):
+        """Call handler(driver, site, url) for every job.
+
+        Yields (site, url, result, error) tuples as jobs finish, in
+        completion order. Drivers are quit once all jobs are done or the
+        caller stops iterating.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scraper")
+        try:
+            futures = {
+                executor.submit(self._run_job, handler, site, url): (site, url)
+                for site, url in jobs
+            }
+            for future in as_completed(futures):
+                site, url = futures[future]
+                try:
+                    yield site, url, future.result(), None
+                except Exception as e:
+                    yield site, url, None, e
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.close()
+
+    def close(self):
+        self.pool.close()
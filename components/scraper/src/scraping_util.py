@@ -3,41 +3,264 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from bs4 import BeautifulSoup
 from webdriver_manager.chrome import ChromeDriverManager
+import asyncio
 import json
-import time
+import re
+import weakref
+import httpx
 
-def retrieve_from_script(driver, url: str, script_name: str, global_tags: list = [], timeout: int = 20):
-    print("retrieving from script")
+try:
+    import orjson
+except ImportError:  # optional, several times faster than json
+    orjson = None
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-AU,en;q=0.9",
+}
+
+def build_driver():
+    """Start a headless Chrome session tuned for scraping"""
+    options = Options()
+    options.page_load_strategy = "eager"
+
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-sync")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-default-apps")
+    options.add_argument("--disable-notifications") 
+    prefs = {"profile.managed_default_content_settings.images": 2}
+    options.add_experimental_option("prefs", prefs)
+    service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=options)
+
+def fetch_script_text(driver, url: str, script_name: str, timeout: int = 20, page_profile: dict = None):
+    """Load url and return the raw text of <script id=script_name>"""
+    if page_profile:
+        apply_page_profile(driver, page_profile)
     driver.get(url)
-    time.sleep(5)
-    try:
-        print("trying")
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.ID, script_name)))
-        print("found\n")
+    return wait_for_script(driver, script_name, timeout)
 
+def retrieve_from_script(driver, url: str, script_name: str, global_tags: list = [], timeout: int = 20, page_profile: dict = None):
+    element = fetch_script_text(driver, url, script_name, timeout, page_profile)
+    return follow_path(loads(element), global_tags)
+
+# Text of <script id=arguments[0]>, or null until the parser has produced it
+SCRIPT_TEXT_JS = """
+const el = document.getElementById(arguments[0]);
+return el && el.textContent ? el.textContent : null;
+"""
+
+def wait_for_script(driver, script_name: str, timeout: int = 20, poll_frequency: float = 0.1):
+    """Return the text of <script id=script_name> as soon as it's on the page.
+
+    Presence and contents come back in the same round trip, so on
+    server-rendered pages this returns on the first poll.
+    """
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+            lambda d: d.execute_script(SCRIPT_TEXT_JS, script_name)
+        )
     except TimeoutException:
-        print(f"Timeout waiting for {script_name}") 
+        raise TimeoutException(f"Timeout waiting for {script_name}")
+
+# URL patterns for Network.setBlockedURLs, by what they block. The DevTools
+# blocklist matches URLs only, so resource types go by file extension and
+# trackers by host.
+BLOCKED_URL_PATTERNS = {
+    "images": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.avif*"],
+    "fonts": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*", "*.wav*"],
+    "stylesheets": ["*.css*"],
+    "scripts": ["*.js", "*.js?*"],
+    "analytics": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*analytics.google.com*",
+        "*hotjar.com*", "*segment.io*", "*segment.com*", "*newrelic.com*", "*nr-data.net*",
+        "*optimizely.com*", "*mixpanel.com*", "*fullstory.com*", "*clarity.ms*",
+    ],
+    "ads": [
+        "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+        "*adservice.google.*", "*facebook.net*", "*connect.facebook.*", "*adnxs.com*",
+        "*criteo.com*", "*taboola.com*", "*outbrain.com*", "*tiktok.com*", "*bat.bing.com*",
+    ],
+}
+
+# pattern list last applied to each driver, so navigations within a site
+# don't repeat the DevTools calls
+_applied_profiles = weakref.WeakKeyDictionary()
+
+def blocked_url_patterns(page_profile: dict):
+    """Expand a site's page_profile into the URL patterns it blocks.
+
+    page_profile looks like {"block": ["images", "fonts"], "block_urls": ["*tracker*"]},
+    with "block" naming groups from BLOCKED_URL_PATTERNS.
+    """
+    patterns = []
+    for group in page_profile.get("block", []):
+        if group not in BLOCKED_URL_PATTERNS:
+            raise ValueError(f"Unknown page_profile block group {group!r}")
+        patterns.extend(BLOCKED_URL_PATTERNS[group])
+    patterns.extend(page_profile.get("block_urls", []))
+    return list(dict.fromkeys(patterns))
+
+def apply_page_profile(driver, page_profile: dict):
+    """Stop the browser requesting anything the site's page_profile blocks.
+
+    Uses the DevTools Network domain, so blocked requests never leave
+    Chrome. Only talks to DevTools when the driver's blocklist changes.
+    """
+    patterns = blocked_url_patterns(page_profile)
+    if _applied_profiles.get(driver) == patterns:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    _applied_profiles[driver] = patterns
+
+# Every matching anchor's absolute href, read in the browser in one go
+HARVEST_LINKS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0]), el => el.href).filter(Boolean);
+"""
+
+def harvest_links(driver, selector: str):
+    """Collect the hrefs of every element matching selector on the current
+    page in a single WebDriver round trip, de-duplicated in page order"""
+    return list(dict.fromkeys(driver.execute_script(HARVEST_LINKS_SCRIPT, selector) or []))
 
-    element = driver.find_element(By.ID, script_name).get_attribute('textContent')
-    json_element = decode_nested_json(element)
+def page_url(url: str, page: int, param: str = "page"):
+    """url for the given results page; page 1 is the url itself"""
+    if page <= 1:
+        return url
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{param}={page}"
 
+def find_script_text(page_html: str, script_name: str):
+    """Raw text of <script id=script_name> in page HTML, or None"""
+    match = re.search(
+        r"<script[^>]*\bid=[\"']" + re.escape(script_name) + r"[\"'][^>]*>(.*?)</script>",
+        page_html,
+        re.DOTALL,
+    )
+    return match.group(1) if match else None
 
-    for tag in global_tags:
-        print(tag)
-        json_element = json_element[tag]
+def extract_script_from_html(page_html: str, script_name: str, global_tags: list = []):
+    """Decode the JSON in <script id=script_name> from raw page HTML.
 
-    return json_element
+    Returns None if the page doesn't contain the script.
+    """
+    text = find_script_text(page_html, script_name)
+    if text is None:
+        return None
+    return follow_path(loads(text), global_tags)
+
+async def fetch_scripts_http(urls: list, script_name: str, global_tags: list = [], max_concurrency: int = 8, timeout: int = 20, headers: dict = None, archive=None, site: str = None, extract=None):
+    """Fetch pages over pooled keep-alive HTTP and pull out a script's JSON.
+
+    Returns {url: data}, with None for pages that failed to load or didn't
+    server-render the script (those need a real browser). Scripts that are
+    found go into archive (a PageArchive), if given, under site.
+
+    If extract is given, it's called as extract(url, data) as each page
+    arrives and its return value is kept in place of data, so a page's
+    decoded tree can be freed as soon as its fields are pulled out. It runs
+    on a worker thread, alongside the page's decoding and archiving.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+    def parse(url, page_html):
+        text = find_script_text(page_html, script_name)
+        if text is None:
+            return None
+        if archive is not None:
+            archive.store(site, url, text)
+        try:
+            data = follow_path(loads(text), global_tags)
+        except (LookupError, ValueError) as e:
+            print(f"Unexpected {script_name} layout at {url}: {e}")
+            return None
+        if extract is not None:
+            return extract(url, data)
+        return data
+
+    async def fetch(client, url):
+        async with semaphore:
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"HTTP fetch failed for {url}: {e}")
+                return url, None
+        # searching, archiving and decoding a multi-megabyte page would
+        # stall every other fetch, so it all happens on a worker thread
+        return url, await asyncio.to_thread(parse, url, response.text)
+
+    async with httpx.AsyncClient(
+        headers={**HTTP_HEADERS, **(headers or {})},
+        limits=limits,
+        timeout=timeout,
+        follow_redirects=True,
+    ) as client:
+        results = await asyncio.gather(*(fetch(client, url) for url in urls))
+
+    return dict(results)
+
+def loads(text):
+    """json.loads, using orjson when it's installed"""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(text)
+    return json.loads(text)
+
+def as_container(value):
+    """Return value ready to be indexed, decoding it first if it's a JSON
+    document embedded in a string. Raises LookupError if it can't be."""
+    if isinstance(value, str):
+        try:
+            value = loads(value)
+        except json.JSONDecodeError:
+            raise LookupError("not a JSON container")
+    if not isinstance(value, (dict, list)):
+        raise LookupError(f"can't index {type(value).__name__}")
+    return value
+
+def lookup(container, key):
+    """Index a dict or list, letting integer and string keys stand in for
+    each other the way they do in hand-written configs. Raises LookupError."""
+    if isinstance(container, dict):
+        if key in container:
+            return container[key]
+        if isinstance(key, int) and str(key) in container:
+            return container[str(key)]
+        raise LookupError("missing key")
+
+    if isinstance(key, str) and key.lstrip("-").isdigit():
+        key = int(key)
+    if isinstance(key, int) and -len(container) <= key < len(container):
+        return container[key]
+    raise LookupError("index out of range" if isinstance(key, int) else "not an index")
+
+def follow_path(obj, keys):
+    """Walk keys down obj, decoding embedded JSON only where the path steps
+    into it. Everything off the path is left as it is."""
+    for key in keys:
+        obj = lookup(as_container(obj), key)
+    return obj
 
 def decode_nested_json(obj):
+    """Decode every embedded JSON string in obj, however deep. Extraction
+    only needs follow_path; this is for when the whole document is wanted."""
     if isinstance(obj, str):
         try:
-            return decode_nested_json(json.loads(obj))
+            return decode_nested_json(loads(obj))
         except json.JSONDecodeError:
             return obj
 
@@ -1,5 +1,5 @@
+import argparse
 import json
-import copy
 import logging
 import datetime
 import pandas as pd
@@ -8,20 +8,21 @@ import sys
 from src.database_logic import PropertyDatabase
 import sqlalchemy as sa
 from sqlalchemy import create_engine, inspect
-from selenium import webdriver
 from pathlib import Path
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from bs4 import BeautifulSoup
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from src.scraping_util import *
+from src.scrape_scheduler import ScrapeScheduler
+from src.scrape_cache import ScrapeCache, DEFAULT_MAX_ENTRIES
+from src.extraction_plan import ExtractionPlan
+from src.page_archive import PageArchive
 from dotenv import load_dotenv
 
 import os
@@ -29,96 +30,68 @@ import os
 logger = logging.getLogger(__name__)
 logging.basicConfig(filename="log.txt", encoding="utf-8", level=logging.DEBUG)
 
+LOAD_BATCH_SIZE = 50
+DEFAULT_WORKERS = 4
+DEFAULT_CACHE_TTL_HOURS = 24
+DEFAULT_ARCHIVE_DIR = "page_archive"
+REPLAY_CHUNK_SIZE = 200
+CONFIG_FILES = ["./src/extraction_configs/domain.json"]
+
+# extracted fields transform_batch reads
+TRANSFORM_FIELDS = [
+    "id", "price", "description", "address", "bedrooms",
+    "property_type", "bathrooms", "carspaces",
+]
+
 class TargetListing:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, plan: ExtractionPlan = None):
         self.config = config
-        self.fields = {k: None for k, v in config["fields"].items()}
+        self.plan = plan or ExtractionPlan.from_config(config)
+        self.fields = {k: None for k in self.plan.fields}
+        self.missing = []
+        self.rejected = None
         self.final_data = None
         self.job_url = None
+        self.scraped_at = None
 
-    def scrape(self, driver, url):
+    def scrape(self, driver, url, archive: PageArchive = None):
         property_data = None
         self.job_url = url
         if self.config["from_script"] == "true":
-            property_data = retrieve_from_script(driver=driver, url = url, script_name=self.config["script_name"], global_tags=self.config["global_tags"])
-            for k,v in self.fields.items():
-                try:
-                    target_fields = self.config["fields"][k]['keys']
-                    nested_field = property_data[target_fields.pop(0)]
-                    for key in target_fields:
-                        print("Curr key:", key)
-                        nested_field = nested_field[key]
-                        if isinstance(nested_field, str):
-                            try:
-                                nested_field = json.loads(nested_field)
-                                
-                            except json.JSONDecodeError:
-
-                                break
-                except KeyError as e:
-                    print(f"Error: Key {e} not found in the following site schema: {property_data}")
-                    continue
-
-                self.fields[k] = nested_field
-                
+            payload = fetch_script_text(
+                driver=driver,
+                url=url,
+                script_name=self.config["script_name"],
+                page_profile=self.config.get("page_profile"),
+            )
+            if archive is not None:
+                archive.store(self.config["site"], url, payload)
+            property_data = follow_path(loads(payload), self.config["global_tags"])
+            self.extract(property_data)
+
+    def replay(self, archive: PageArchive, entry: dict):
+        """Extract from an archived payload instead of a live page"""
+        self.job_url = entry["url"]
+        payload = archive.load(entry["sha256"])
+        self.extract(follow_path(loads(payload), self.config["global_tags"]))
+        self.scraped_at = entry["fetched_at"]
+
+    def extract(self, property_data):
+        """Pull the configured fields out of a page's decoded script data"""
+        self.scraped_at = datetime.datetime.now().isoformat()
+        self.fields, self.missing = self.plan.apply(property_data)
+        if self.missing:
+            print(f"{self.job_url}: missing {'; '.join(str(m) for m in self.missing)}")
+
         if self.fields["description"]:
            self.fields["description"] = "".join(self.fields["description"])
 
-
-
-
     def transform(self):
-        data_df = pd.DataFrame([self.fields])
-
-   
-
-        data_df["property_type"] = (
-                data_df["property_type"]
-                .str.lower()
-                .str.replace("/", " ", regex=False)
-                .str.replace(r"\s+", " ", regex=True)
-                .str.strip()
-            )
-        
-        data_df[["state", "postcode"]] = (
-            data_df["address"]
-            .str.extract(r"\b([A-Z]{2,3})\s(\d{4})\b")
-        )
-
-        data_df["address"] = (
-            data_df["address"]
-            .str.replace(".", "", regex=False)
-            .str.replace(",", "", regex=False)
-            .str.title()
-        )
-        
-        row = data_df.iloc[0] 
-
-        transformed_data = {
-            "id": str(row["id"]),
-            "price": float(row["price"]) if pd.notna(row["price"]) else 0.0,
-            "description": str(row["description"]) if pd.notna(row["description"]) else "",
-            "address": str(row["address"]) if pd.notna(row["address"]) else "",
-            "bedrooms": int(row["bedrooms"]) if pd.notna(row["bedrooms"]) else 0,
-            "property_type": str(row["property_type"]) if pd.notna(row["property_type"]) else "",
-            "bathrooms": int(row["bathrooms"]) if pd.notna(row["bathrooms"]) else 0,
-            "carspaces": int(row["carspaces"]) if pd.notna(row["carspaces"]) else 0,
-            "state": str(row["state"]) if pd.notna(row["state"]) else "",
-            "postcode": str(row["postcode"]) if pd.notna(row["postcode"]) else "",
-        }
-
-        final_data = {
-            "scraped_at": datetime.datetime.now().isoformat(),
-            "job_url": str(self.job_url),
-            "property_data" : dict(transformed_data)
-        }
-
-        self.final_data = final_data
-        return final_data
+        transform_listings([self])
+        if self.rejected:
+            raise ValueError(f"{self.job_url}: {self.rejected}")
+        return self.final_data
 
-
-       
-    
     def load(self, db: PropertyDatabase):
          # TODO: Handle duplicate keys on different properties
         # Handle duplicates in general better.
@@ -132,6 +105,136 @@ class TargetListing:
         action = db.upsert_property(property_data, scrape_metadata)
         return action
 
+def _strings(series):
+    """Blank out anything that isn't a string so the .str accessor works"""
+    return series.where(series.map(type) == str)
+
+def _text(series):
+    return series.where(series.notna(), "").map(str)
+
+def _number(series, dtype, field, rejected):
+    """Missing values become 0; any other value that isn't a number (e.g.
+    "$650 pw", or a dict from a wrong field path) rejects its row"""
+    numbers = pd.to_numeric(series, errors="coerce")
+    for index in series.index[series.notna() & numbers.isna()]:
+        rejected.setdefault(index, f"{field} {series[index]!r} isn't a number")
+    return numbers.fillna(0).astype(dtype)
+
+def transform_batch(rows, rejected: dict = None):
+    """Normalise the extracted fields of many listings at once.
+
+    Takes an iterable of field dicts, as left by TargetListing.extract, and
+    returns the transformed property_data records in the same order. Each
+    step runs column-wise over the whole batch. A row with a value that
+    isn't a number in a numeric column gets None instead of a record, and
+    if `rejected` is given, the reason is stored under the row's index.
+    """
+    rejected = {} if rejected is None else rejected
+    data_df = pd.DataFrame(list(rows), columns=TRANSFORM_FIELDS, dtype=object)
+    if data_df.empty:
+        return []
+
+    property_type = (
+        _strings(data_df["property_type"])
+        .str.lower()
+        .str.replace("/", " ", regex=False)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+    address = _strings(data_df["address"])
+    state_postcode = address.str.extract(r"\b([A-Z]{2,3})\s(\d{4})\b")
+    address = (
+        address
+        .str.replace(".", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.title()
+    )
+
+    columns = {
+        "id": data_df["id"].map(str),
+        "price": _number(data_df["price"], float, "price", rejected),
+        "description": _text(data_df["description"]),
+        "address": _text(address),
+        "bedrooms": _number(data_df["bedrooms"], "int64", "bedrooms", rejected),
+        "property_type": _text(property_type),
+        "bathrooms": _number(data_df["bathrooms"], "int64", "bathrooms", rejected),
+        "carspaces": _number(data_df["carspaces"], "int64", "carspaces", rejected),
+        "state": _text(state_postcode[0]),
+        "postcode": _text(state_postcode[1]),
+    }
+    # tolist() hands back plain Python ints/floats/strs
+    values = [series.tolist() for series in columns.values()]
+    return [
+        None if index in rejected else dict(zip(columns, row))
+        for index, row in enumerate(zip(*values))
+    ]
+
+def transform_listings(jobs: list):
+    """Transform many TargetListings in one pass and set their final_data.
+
+    Rejected listings keep final_data None and get the reason in
+    job.rejected. Returns the final_data of the listings that passed.
+    """
+    rejected = {}
+    records = transform_batch((job.fields for job in jobs), rejected)
+    now = datetime.datetime.now().isoformat()
+    for index, (job, transformed_data) in enumerate(zip(jobs, records)):
+        if transformed_data is None:
+            job.rejected = rejected[index]
+            print(f"Rejected {job.job_url}: {job.rejected}")
+            continue
+        job.final_data = {
+            "scraped_at": job.scraped_at or now,
+            "job_url": str(job.job_url),
+            "property_data": transformed_data
+        }
+    return [job.final_data for job in jobs if job.final_data is not None]
+
+def load_batch(db: PropertyDatabase, jobs: list, cache: ScrapeCache = None):
+    """Load many listings in one transaction, falling back to one-by-one
+    loads so a single bad listing doesn't sink the whole batch.
+
+    Listings that haven't been transformed yet are transformed together
+    first, and any the transform rejects are left out.
+    """
+    if not jobs:
+        return None
+    untransformed = [job for job in jobs if job.final_data is None]
+    if untransformed:
+        transform_listings(untransformed)
+        jobs = [job for job in jobs if job.final_data is not None]
+        if not jobs:
+            return None
+
+    batch = []
+    for job in jobs:
+        scrape_metadata = {
+            "scraped_at": job.final_data["scraped_at"],
+            "job_url": job.final_data["job_url"]
+        }
+        batch.append((job.final_data["property_data"], scrape_metadata))
+
+    loaded = jobs
+    counts = None
+    try:
+        counts = db.upsert_properties(batch)
+        print(f"Loaded batch of {len(batch)}: {counts}")
+    except Exception as e:
+        print(f"Batch load failed ({e}), loading listings individually")
+        loaded = []
+        for job in jobs:
+            try:
+                job.load(db)
+                loaded.append(job)
+            except Exception as e:
+                print(f"Failed to load {job.job_url}: {e}")
+
+    if cache is not None:
+        for job in loaded:
+            cache.record(job.job_url, job.final_data["property_data"]["id"], job.final_data["scraped_at"])
+    return counts
+
 def load_config(file_path):
     config_file = None 
     with open(file_path, "r") as file:
@@ -142,32 +245,60 @@ def load_config(file_path):
 
     return config_file
 
+def search_urls(config):
+    """One search URL per property type and suburb, so each suburb can be
+    discovered (and paginated) on its own"""
+    suburbs = [tag.strip() for tag in config["location_tags"].split(",") if tag.strip()]
+    return [
+        config["base_url"] + target + suburb
+        for target in config["target_property_type"]
+        for suburb in suburbs
+    ]
+
 def extract_listing_pages(driver, links, config):
+    """Collect listing URLs from search results, following up to
+    config["pagination"]["max_pages"] result pages per search URL"""
+    pagination = config.get("pagination", {})
+    max_pages = int(pagination.get("max_pages", 1))
+    param = pagination.get("param", "page")
+    selector = config["listing_card_selector"]
+    if config.get("page_profile"):
+        apply_page_profile(driver, config["page_profile"])
+
     all_listings = []
     for link in links:
-        driver.get(link)
-        try:
-            _wait_for_element_presence(driver=driver, locator=(By.CSS_SELECTOR, config["listing_card_selector"]))
-        except TimeoutException:
-                continue
-           
-            # Get all property listing links directly
-            # This avoids the carousel clones issue
-        link_elements = driver.find_elements(By.CSS_SELECTOR, 'a.address')
-        
-        # Remove duplicates (carousel creates clones)
-        unique_urls = set()
-        for link_element in link_elements:
+        seen = set()
+        for page in range(1, max_pages + 1):
+            driver.get(page_url(link, page, param))
             try:
-                url = link_element.get_attribute('href')
-                if url:
-                    unique_urls.add(url)
-            except Exception as e:
-                print(f"Error: {e}")
-                continue
-        
-        all_listings.extend(list(unique_urls))
-    return all_listings
+                _wait_for_element_presence(driver=driver, locator=(By.CSS_SELECTOR, selector))
+            except TimeoutException:
+                break
+
+            # carousel clones repeat links, and past the last page some
+            # sites serve the last page again
+            new_urls = [url for url in harvest_links(driver, selector) if url not in seen]
+            if not new_urls:
+                break
+            seen.update(new_urls)
+            all_listings.extend(new_urls)
+
+    return list(dict.fromkeys(all_listings))
+
+def discover_listings(pool, links, config, workers: int = DEFAULT_WORKERS):
+    """Run extract_listing_pages for many search URLs at once, each on a
+    driver borrowed from pool"""
+    def discover(link):
+        try:
+            with pool.session() as driver:
+                return extract_listing_pages(driver, [link], config)
+        except Exception as e:
+            print(f"Failed to discover listings at {link}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="discovery") as executor:
+        results = list(executor.map(discover, links))
+    return list(dict.fromkeys(url for urls in results for url in urls))
 
 
 def _wait_for_element_presence(driver, locator: tuple[str, str], timeout = 10,):
@@ -186,68 +317,225 @@ def _wait_for_element_clickable(driver, locator: tuple[str, str], timeout = 10):
     )
 
 
-async def main():
-    db = PropertyDatabase()
-    config_files = ["./src/extraction_configs/domain.json"]
+async def fetch_listings_http(links, config, plan: ExtractionPlan = None, archive: PageArchive = None):
+    """Fetch and extract listings over plain HTTP.
 
-    config_objs = {}
+    Returns the extracted jobs plus the links whose script tag wasn't in
+    the server-rendered HTML, so they can be retried in a browser.
+    """
+    plan = plan or ExtractionPlan.from_config(config)
+    failed = set()
 
-    for path in config_files:
-        config_obj = load_config(path)
-        config_objs[config_obj["site"]] = config_obj 
+    def extract(link, property_data):
+        try:
+            job = TargetListing(config=config, plan=plan)
+            job.job_url = link
+            job.extract(property_data)
+            return job
+        except Exception as e:
+            print(f"Failed to process {link}: {e}")
+            failed.add(link)
+            return None
+
+    extracted = await fetch_scripts_http(
+        links,
+        script_name=config["script_name"],
+        global_tags=config["global_tags"],
+        max_concurrency=int(config.get("max_concurrency", DEFAULT_WORKERS)),
+        headers=config.get("http_headers"),
+        archive=archive,
+        site=config["site"],
+        extract=extract,
+    )
 
-    
-    
-    options = Options()
-    options.page_load_strategy = "eager"
-
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-background-networking")
-    options.add_argument("--disable-sync")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-default-apps")
-    options.add_argument("--disable-notifications") 
-    prefs = {"profile.managed_default_content_settings.images": 2}
-    options.add_experimental_option("prefs", prefs)
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)    
-        
-    target_urls = [
-        config["base_url"] + target + config["location_tags"] 
-        for site, config in config_objs.items()
-        for target in config["target_property_type"]
+    jobs, needs_browser = [], []
+    for link, job in extracted.items():
+        if job is not None:
+            jobs.append(job)
+        elif link not in failed:
+            needs_browser.append(link)
+    return jobs, needs_browser
+
+
+def scrape_listing(driver, site, url, config, plan: ExtractionPlan = None, archive: PageArchive = None):
+    """Scrape a single listing page on the given driver. The listing is
+    transformed later, with the rest of its load batch."""
+    job = TargetListing(config=config, plan=plan)
+    job.scrape(driver=driver, url=url, archive=archive)
+    return job
+
+
+def _replay_chunk(args):
+    """Extract and transform one chunk of archived pages. Runs in a worker
+    process, so it takes and returns plain picklable data."""
+    archive_root, config, entries = args
+    archive = PageArchive(archive_root)
+    plan = ExtractionPlan.from_config(config)
+    jobs = []
+    for entry in entries:
+        try:
+            job = TargetListing(config=config, plan=plan)
+            job.replay(archive, entry)
+            jobs.append(job)
+        except Exception as e:
+            print(f"Failed to replay {entry['url']}: {e}")
+    return transform_listings(jobs)
+
+
+def replay_archive(db: PropertyDatabase, archive: PageArchive, configs: dict, since=None, until=None, workers: int = None, chunk_size: int = REPLAY_CHUNK_SIZE):
+    """Re-run extract, transform and load over archived pages, with no browser.
+
+    Uses each URL's newest payload fetched in [since, until), extracting
+    with the current site configs across `workers` processes. Only listings
+    that actually change get a scrape_history row (queuing them for
+    vectorising), so replaying twice is harmless. Returns the load counts.
+    """
+    entries = [
+        entry for entry in archive.latest_entries(since, until)
+        if entry["site"] in configs
     ]
+    entries.sort(key=lambda entry: entry["fetched_at"])
+    chunks = []
+    for site, config in configs.items():
+        site_entries = [entry for entry in entries if entry["site"] == site]
+        chunks.extend(
+            (archive.root, config, site_entries[i:i + chunk_size])
+            for i in range(0, len(site_entries), chunk_size)
+        )
+    print(f"Replaying {len(entries)} archived pages in {len(chunks)} chunks")
+
+    totals = {"created": 0, "updated": 0, "unchanged": 0}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for records in executor.map(_replay_chunk, chunks):
+            batch = [
+                (record["property_data"], {"scraped_at": record["scraped_at"], "job_url": record["job_url"]})
+                for record in records
+            ]
+            counts = db.upsert_properties(batch, log_unchanged=False)
+            for key, value in counts.items():
+                totals[key] += value
+    print(f"Replay finished: {totals}")
+    return totals
+
+
+def load_site_configs(config_files=CONFIG_FILES):
+    """Site name -> extraction config"""
+    config_objs = {}
+    for path in config_files:
+        config_obj = load_config(path)
+        config_objs[config_obj["site"]] = config_obj
+    return config_objs
 
 
-    target_links = {site: extract_listing_pages(driver=driver, links=target_urls, config=config) for site, config in config_objs.items()}
-
-    #TODO: (maybe) cache recently scraped links, if they appear again within a time frame, dont bother scraping
-
-    for site, links in target_links.items():
-        for link in links:
-            try:
+async def main(workers: int = None):
+    db = PropertyDatabase()
+    db.migrate()
+    db.maintain_partitions()
+    if os.getenv("SCRAPE_HISTORY_RETENTION_MONTHS"):
+        db.apply_retention(
+            int(os.getenv("SCRAPE_HISTORY_RETENTION_MONTHS")),
+            archive_dir=os.getenv("SCRAPE_HISTORY_ARCHIVE_DIR")
+        )
+    workers = workers or int(os.getenv("SCRAPER_WORKERS", DEFAULT_WORKERS))
+    config_objs = load_site_configs()
+    archive_dir = os.getenv("PAGE_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+    archive = PageArchive(archive_dir) if archive_dir else None
 
-                config = copy.deepcopy(config_objs[site]) 
+    # compiled once per site and shared by every listing
+    plans = {site: ExtractionPlan.from_config(config) for site, config in config_objs.items()}
 
-                job = TargetListing(config=config)
+    site_limits = {
+        site: int(config["max_concurrency"])
+        for site, config in config_objs.items()
+        if "max_concurrency" in config
+    }
+    scheduler = ScrapeScheduler(workers=workers, site_limits=site_limits)
+    cache = ScrapeCache(
+        os.getenv("SCRAPE_CACHE_PATH", "scrape_cache.json"),
+        max_entries=int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+    ).load()
+
+    try:
+        target_links = {}
+        for site, config in config_objs.items():
+            target_links[site] = discover_listings(
+                scheduler.pool,
+                search_urls(config),
+                config,
+                workers=min(workers, int(config.get("max_concurrency", workers))),
+            )
+            print(f"{site}: discovered {len(target_links[site])} listings")
 
-                job.scrape(driver=driver, url=link)
+        ttls = {
+            site: datetime.timedelta(hours=float(config.get("cache_ttl_hours", DEFAULT_CACHE_TTL_HOURS)))
+            for site, config in config_objs.items()
+        }
+        for site, links in target_links.items():
+            target_links[site] = cache.filter_stale(links, ttls[site])
+            print(f"{site}: skipping {len(links) - len(target_links[site])} recently scraped listings")
+
+        def fresh_elsewhere(site, job):
+            # the same property is often listed under more than one URL, which
+            # only shows once the page has been extracted
+            property_id = job.fields.get("id")
+            return property_id is not None and cache.is_fresh_property(property_id, ttls[site])
+
+        jobs = []
+        pending = []
+        for site, links in target_links.items():
+            config = config_objs[site]
+            if config.get("fetch_mode") == "http":
+                http_jobs, links = await fetch_listings_http(links, config, plans[site], archive)
+                stale_jobs = [job for job in http_jobs if not fresh_elsewhere(site, job)]
+                if len(stale_jobs) < len(http_jobs):
+                    print(f"{site}: skipping {len(http_jobs) - len(stale_jobs)} listings scraped recently under another URL")
+                pending.extend(stale_jobs)
+            jobs.extend((site, link) for link in links)
+
+        def handler(driver, site, url):
+            return scrape_listing(driver, site, url, config_objs[site], plans[site], archive)
+
+        skipped = 0
+        for site, link, job, error in scheduler.run(jobs, handler):
+            if error is not None:
+                print(f"Failed to process {link}: {error}")
+                continue
+            if fresh_elsewhere(site, job):
+                skipped += 1
+                continue
 
-                job.transform()
+            pending.append(job)
+            if len(pending) >= LOAD_BATCH_SIZE:
+                load_batch(db, pending, cache)
+                pending = []
 
-                job.load(db)  
-                
-            except Exception as e:
-                print(f"Failed to process {link}: {e}")
-                continue
+        load_batch(db, pending, cache)
+        if skipped:
+            print(f"Skipped {skipped} listings scraped recently under another URL")
+        db.refresh_stats()
+    finally:
+        scheduler.close()
+        cache.save()
 
-                    
-   
-    driver.quit()
+def replay_main(since=None, until=None, workers: int = None):
+    db = PropertyDatabase()
+    db.migrate()
+    archive = PageArchive(os.getenv("PAGE_ARCHIVE_DIR") or DEFAULT_ARCHIVE_DIR)
+    replay_archive(db, archive, load_site_configs(), since=since, until=until, workers=workers)
+    db.refresh_stats()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Crawl listings, or replay archived pages")
+    parser.add_argument("--replay", action="store_true", help="re-extract archived pages instead of crawling")
+    parser.add_argument("--since", help="replay pages fetched at or after this ISO timestamp")
+    parser.add_argument("--until", help="replay pages fetched before this ISO timestamp")
+    parser.add_argument("--workers", type=int, help="worker threads (crawl) or processes (replay)")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay_main(since=args.since, until=args.until, workers=args.workers)
+    else:
+        asyncio.run(main(workers=args.workers))
    
 '''
     TODO: LATER (this part should done when CICD is up and running)
@@ -0,0 +1,262 @@
+# async_database.py
+import datetime
+import os
+import asyncpg
+from dotenv import load_dotenv
+
+from vectoriser.src.backend.database_logic import (
+    APPROXIMATE_STATS_QUERY,
+    EMBEDDINGS_VERSION_QUERY,
+    PROPERTY_COLUMNS,
+    PROPERTIES_TABLE_COLUMNS,
+    STATS_QUERY,
+    content_fingerprint,
+)
+
+load_dotenv()  # Ensure .env variables are loaded
+
+# Postgres types of the properties columns written by upserts, used to
+# pass whole batches as typed arrays
+COLUMN_TYPES = {
+    "property_id": "text",
+    "price": "real",
+    "bedrooms": "integer",
+    "bathrooms": "integer",
+    "carspaces": "integer",
+    "description": "text",
+    "property_type": "text",
+    "state": "text",
+    "postcode": "integer",
+    "content_hash": "text",
+}
+
+def _coerce(column, value):
+    """asyncpg won't cast text to numbers for us the way psycopg2's literals do"""
+    if value is None or value == "":
+        return None if COLUMN_TYPES[column] != "text" else value
+    if COLUMN_TYPES[column] == "integer":
+        return int(value)
+    if COLUMN_TYPES[column] == "real":
+        return float(value)
+    return str(value)
+
+def _property_row(property_data):
+    row = [_coerce(col, property_data[key]) for col, key in PROPERTY_COLUMNS.items()]
+    row.append(content_fingerprint(property_data))
+    return row
+
+def _timestamp(value):
+    if isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+    return value
+
+class AsyncPropertyDatabase:
+    """asyncio counterpart of PropertyDatabase, backed by an asyncpg pool.
+
+    asyncpg prepares and caches every statement it runs per connection, so
+    the fixed SQL below is parsed and planned once per pooled connection.
+    Create instances with `await AsyncPropertyDatabase.connect()`.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    @classmethod
+    async def connect(cls, min_size: int = None, max_size: int = None):
+        pool = await asyncpg.create_pool(
+            database=os.getenv("PGNAME"),
+            user=os.getenv("PGUSER"),
+            password=os.getenv("PGPASSWORD"),
+            host="localhost",
+            port=int(os.getenv("SYSPGPORT", 5432)),
+            min_size=min_size or int(os.getenv("PGPOOL_MIN", 1)),
+            max_size=max_size or int(os.getenv("PGPOOL_MAX", 10)),
+        )
+        return cls(pool)
+
+    async def close(self):
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _upsert_sql(self, values_sql):
+        columns = list(COLUMN_TYPES)
+        update_clause = ", ".join(
+            f"{col} = EXCLUDED.{col}" for col in columns if col != "property_id"
+        )
+        return f"""
+            INSERT INTO properties ({", ".join(columns)})
+            {values_sql}
+            ON CONFLICT (property_id) DO UPDATE
+            SET {update_clause}
+            WHERE properties.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        """
+
+    async def upsert_property(self, property_data, scrape_metadata):
+        """Insert new property or update existing one.
+
+        Returns "created", "updated", or "unchanged".
+        """
+        n = len(COLUMN_TYPES)
+        placeholders = ", ".join(f"${i}" for i in range(1, n + 1))
+        sql = f"""
+            WITH upserted AS (
+                {self._upsert_sql(f"VALUES ({placeholders})")}
+                RETURNING (xmax = 0) AS created
+            ), logged AS (
+                INSERT INTO scrape_history (
+                    property_id, scraped_at, job_url, vectorised
+                )
+                SELECT ${n + 1}, ${n + 2}, ${n + 3}, NOT EXISTS (SELECT 1 FROM upserted)
+            )
+            SELECT created FROM upserted
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(
+                sql,
+                *_property_row(property_data),
+                str(property_data["id"]),
+                _timestamp(scrape_metadata["scraped_at"]),
+                scrape_metadata["job_url"]
+            )
+
+        if row is None:
+            return "unchanged"
+        return "created" if row["created"] else "updated"
+
+    async def upsert_properties(self, batch, log_unchanged: bool = True):
+        """Insert or update many properties in a single transaction.
+
+        Takes (property_data, scrape_metadata) pairs and log_unchanged like
+        PropertyDatabase.upsert_properties and returns the same counts.
+        """
+        batch = list(batch)
+        counts = {"created": 0, "updated": 0, "unchanged": 0}
+        if not batch:
+            return counts
+
+        # ON CONFLICT can't touch the same row twice in one statement
+        latest = {}
+        for property_data, _ in batch:
+            latest[property_data["id"]] = property_data
+        rows = [_property_row(property_data) for property_data in latest.values()]
+
+        # Each column goes over as one array, so the statement text (and
+        # its prepared plan) is the same whatever the batch size
+        unnest = ", ".join(
+            f"${i}::{pg_type}[]" for i, pg_type in enumerate(COLUMN_TYPES.values(), start=1)
+        )
+        columns = [list(column) for column in zip(*rows)]
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                written = await conn.fetch(
+                    self._upsert_sql(f"SELECT * FROM unnest({unnest})")
+                    + " RETURNING property_id, (xmax = 0) AS created",
+                    *columns
+                )
+
+                changed = {row["property_id"] for row in written}
+                history = [
+                    (p, m) for p, m in batch
+                    if log_unchanged or str(p["id"]) in changed
+                ]
+                if history:
+                    await conn.execute("""
+                        INSERT INTO scrape_history (
+                            property_id, scraped_at, job_url, vectorised
+                        )
+                        SELECT * FROM unnest($1::text[], $2::timestamp[], $3::text[], $4::boolean[])
+                    """,
+                        [str(p["id"]) for p, _ in history],
+                        [_timestamp(m["scraped_at"]) for _, m in history],
+                        [m["job_url"] for _, m in history],
+                        [str(p["id"]) not in changed for p, _ in history]
+                    )
+
+        for row in written:
+            counts["created" if row["created"] else "updated"] += 1
+        counts["unchanged"] = len(latest) - len(written)
+        return counts
+
+    async def get_property(self, property_id):
+        """Get a single property by ID"""
+        row = await self.pool.fetchrow(
+            "SELECT * FROM properties WHERE property_id = $1",
+            property_id
+        )
+        return dict(row) if row else None
+
+    async def get_properties(self, property_ids):
+        """Get many properties by ID in one query, keyed by property_id"""
+        if not property_ids:
+            return {}
+        rows = await self.pool.fetch(
+            "SELECT * FROM properties WHERE property_id = ANY($1::text[])",
+            list(property_ids)
+        )
+        return {row["property_id"]: dict(row) for row in rows}
+
+    async def get_all_properties(self):
+        """Get all properties"""
+        return [row async for row in self.iter_properties()]
+
+    async def iter_properties(self, chunk_size: int = 1000, columns: list = None):
+        """Stream properties, most recently updated first, using the same
+        (updated_at, property_id) keyset as PropertyDatabase.iter_properties"""
+        if columns:
+            unknown = set(columns) - PROPERTIES_TABLE_COLUMNS
+            if unknown:
+                raise ValueError(f"Unknown properties columns: {sorted(unknown)}")
+            select_list = ", ".join(dict.fromkeys(list(columns) + ["updated_at", "property_id"]))
+        else:
+            select_list = "*"
+
+        last_key = None
+        while True:
+            if last_key is None:
+                rows = await self.pool.fetch(f"""
+                    SELECT {select_list} FROM properties
+                    ORDER BY updated_at DESC, property_id DESC
+                    LIMIT $1
+                """, chunk_size)
+            else:
+                rows = await self.pool.fetch(f"""
+                    SELECT {select_list} FROM properties
+                    WHERE (updated_at, property_id) < ($1, $2)
+                    ORDER BY updated_at DESC, property_id DESC
+                    LIMIT $3
+                """, *last_key, chunk_size)
+
+            if not rows:
+                return
+            last_key = (rows[-1]["updated_at"], rows[-1]["property_id"])
+
+            for row in rows:
+                yield {col: row[col] for col in columns} if columns else dict(row)
+
+            if len(rows) < chunk_size:
+                return
+
+    async def get_scrape_history(self, property_id):
+        """Get scrape history for a property"""
+        rows = await self.pool.fetch("""
+            SELECT scraped_at, job_url
+            FROM scrape_history
+            WHERE property_id = $1
+            ORDER BY scraped_at DESC
+        """, property_id)
+        return [dict(row) for row in rows]
+
+    async def get_stats(self, approximate: bool = False):
+        """Get database statistics, see PropertyDatabase.get_stats"""
+        row = await self.pool.fetchrow(APPROXIMATE_STATS_QUERY if approximate else STATS_QUERY)
+        return dict(row)
+
+    async def get_embeddings_version(self):
+        """See PropertyDatabase.get_embeddings_version"""
+        return await self.pool.fetchval(EMBEDDINGS_VERSION_QUERY)
@@ -1,215 +1,1081 @@
 # database.py
+import gzip
+import hashlib
+import json
 import os
+import threading
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.errors
+from psycopg2 import sql
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError
 from dotenv import load_dotenv
 
 load_dotenv()  # Ensure .env variables are loaded
 
-      
+# properties column -> key in the transformed listing
+PROPERTY_COLUMNS = {
+    "property_id": "id",
+    "price": "price",
+    "bedrooms": "bedrooms",
+    "bathrooms": "bathrooms",
+    "carspaces": "carspaces",
+    "description": "description",
+    "property_type": "property_type",
+    "state": "state",
+    "postcode": "postcode",
+}
 
-class PropertyDatabase:
-    def __init__(self):
-        self.connection = psycopg2.connect(
-            database=os.getenv("PGNAME"),
-            user=os.getenv("PGUSER"),
-            password=os.getenv("PGPASSWORD"),
-            host="localhost",
-            port=os.getenv("SYSPGPORT")
+PROPERTIES_TABLE_COLUMNS = set(PROPERTY_COLUMNS) | {"content_hash", "created_at", "updated_at"}
+
+def content_fingerprint(property_data):
+    """Stable hash of a transformed listing, used to detect real changes"""
+    normalised = json.dumps(property_data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+# Arbitrary key for pg_advisory_xact_lock, held while migrating
+MIGRATION_LOCK_ID = 7254001
+
+# Compacted scrapes live in property_scrape_summary, the rest are still rows
+# in scrape_history; this view adds the two together
+SCRAPE_STATS_VIEW = """
+CREATE OR REPLACE VIEW property_scrape_stats AS
+SELECT
+    property_id,
+    LEAST(s.first_seen, h.first_seen) AS first_seen,
+    GREATEST(s.last_seen, h.last_seen) AS last_seen,
+    COALESCE(s.scrape_count, 0) + COALESCE(h.scrape_count, 0) AS scrape_count
+FROM property_scrape_summary s
+FULL JOIN (
+    SELECT property_id, MIN(scraped_at) AS first_seen,
+           MAX(scraped_at) AS last_seen, COUNT(*) AS scrape_count
+    FROM scrape_history
+    GROUP BY property_id
+) h USING (property_id)
+"""
+
+# (version, name, statements), applied in order by PropertyDatabase.migrate.
+# Never edit a migration that has shipped; add a new one instead.
+MIGRATIONS = [
+    (1, "create properties and scrape_history", [
+        """
+        CREATE TABLE IF NOT EXISTS properties (
+            property_id TEXT PRIMARY KEY,
+            price REAL,
+            bedrooms INTEGER,
+            bathrooms INTEGER,
+            carspaces INTEGER,
+            postcode INTEGER,
+            property_type TEXT,
+            state TEXT,
+            description TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS scrape_history (
+            id SERIAL PRIMARY KEY,
+            property_id TEXT NOT NULL,
+            scraped_at TIMESTAMP NOT NULL,
+            job_url TEXT NOT NULL,
+            vectorised BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (property_id) REFERENCES properties (property_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_property_id ON scrape_history(property_id)",
+    ]),
+    (2, "add properties.content_hash", [
+        "ALTER TABLE properties ADD COLUMN IF NOT EXISTS content_hash TEXT",
+    ]),
+    (3, "keyset index on properties(updated_at, property_id)", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_updated_at
+        ON properties(updated_at DESC, property_id DESC)
+        """,
+    ]),
+    (4, "partial index on unvectorised scrapes", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_scrape_history_unvectorised
+        ON scrape_history(id) WHERE vectorised = FALSE
+        """,
+    ]),
+    (5, "composite index on scrape_history(property_id, scraped_at)", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_scrape_history_property_scraped_at
+        ON scrape_history(property_id, scraped_at DESC)
+        """,
+        # covered by the composite index's leading column
+        "DROP INDEX IF EXISTS idx_property_id",
+    ]),
+    (6, "search filter indexes on properties", [
+        "CREATE INDEX IF NOT EXISTS idx_properties_price ON properties(price)",
+        "CREATE INDEX IF NOT EXISTS idx_properties_postcode_price ON properties(postcode, price)",
+        "CREATE INDEX IF NOT EXISTS idx_properties_bedrooms ON properties(bedrooms)",
+    ]),
+    (7, "maintain properties.updated_at with a trigger", [
+        # keyset pagination can't step past NULLs
+        "UPDATE properties SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL",
+        "ALTER TABLE properties ALTER COLUMN updated_at SET NOT NULL",
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_properties_updated_at ON properties",
+        """
+        CREATE TRIGGER trg_properties_updated_at
+        BEFORE UPDATE ON properties
+        FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+        """,
+    ]),
+    (8, "per-property scrape summaries for compacted history", [
+        """
+        CREATE TABLE IF NOT EXISTS property_scrape_summary (
+            property_id TEXT PRIMARY KEY REFERENCES properties (property_id),
+            first_seen TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL,
+            scrape_count BIGINT NOT NULL
         )
-        self.connection.autocommit = True
+        """,
+        SCRAPE_STATS_VIEW,
+    ]),
+    (9, "partition scrape_history by month", [
+        # Creates any missing monthly partitions from start_at's month up to
+        # months_ahead past the current one. Rows that landed in the default
+        # partition are moved into the new partition before it's attached.
+        """
+        CREATE OR REPLACE FUNCTION ensure_scrape_history_partitions(start_at TIMESTAMP, months_ahead INTEGER)
+        RETURNS INTEGER AS $$
+        DECLARE
+            month_start DATE := date_trunc('month', start_at);
+            last_month DATE := date_trunc('month', CURRENT_TIMESTAMP) + make_interval(months => months_ahead);
+            partition_name TEXT;
+            created INTEGER := 0;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                partition_name := format('scrape_history_p%s', to_char(month_start, 'YYYYMM'));
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I (LIKE scrape_history INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                        partition_name
+                    );
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM scrape_history_default WHERE scraped_at >= %L AND scraped_at < %L RETURNING *) '
+                        'INSERT INTO %I SELECT * FROM moved',
+                        month_start, (month_start + INTERVAL '1 month')::DATE, partition_name
+                    );
+                    EXECUTE format(
+                        'ALTER TABLE scrape_history ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, month_start, (month_start + INTERVAL '1 month')::DATE
+                    );
+                    created := created + 1;
+                END IF;
+                month_start := month_start + INTERVAL '1 month';
+            END LOOP;
+            RETURN created;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        # the view would otherwise follow the renamed legacy table
+        "DROP VIEW IF EXISTS property_scrape_stats",
+        "ALTER TABLE scrape_history RENAME TO scrape_history_legacy",
+        "DROP INDEX IF EXISTS idx_scrape_history_unvectorised",
+        "DROP INDEX IF EXISTS idx_scrape_history_property_scraped_at",
+        # keep the id sequence alive when the legacy table is dropped
+        "ALTER SEQUENCE scrape_history_id_seq OWNED BY NONE",
+        """
+        CREATE TABLE scrape_history (
+            id BIGINT NOT NULL DEFAULT nextval('scrape_history_id_seq'),
+            property_id TEXT NOT NULL REFERENCES properties (property_id),
+            scraped_at TIMESTAMP NOT NULL,
+            job_url TEXT NOT NULL,
+            vectorised BOOLEAN DEFAULT FALSE,
+            PRIMARY KEY (id, scraped_at)
+        ) PARTITION BY RANGE (scraped_at)
+        """,
+        "ALTER SEQUENCE scrape_history_id_seq OWNED BY scrape_history.id",
+        "CREATE TABLE scrape_history_default PARTITION OF scrape_history DEFAULT",
+        """
+        CREATE INDEX idx_scrape_history_unvectorised
+        ON scrape_history(id) WHERE vectorised = FALSE
+        """,
+        """
+        CREATE INDEX idx_scrape_history_property_scraped_at
+        ON scrape_history(property_id, scraped_at DESC)
+        """,
+        """
+        SELECT ensure_scrape_history_partitions(
+            COALESCE((SELECT MIN(scraped_at) FROM scrape_history_legacy), LOCALTIMESTAMP),
+            3
+        )
+        """,
+        """
+        INSERT INTO scrape_history (id, property_id, scraped_at, job_url, vectorised)
+        SELECT id, property_id, scraped_at, job_url, vectorised
+        FROM scrape_history_legacy
+        """,
+        "DROP TABLE scrape_history_legacy",
+        SCRAPE_STATS_VIEW,
+    ]),
+    (10, "incrementally maintained database statistics", [
+        # A single row of running totals, kept current by statement-level
+        # triggers so get_stats never has to scan the big tables
+        """
+        CREATE TABLE database_stats (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            total_properties BIGINT NOT NULL,
+            priced_properties BIGINT NOT NULL,
+            price_sum NUMERIC NOT NULL,
+            total_scrapes BIGINT NOT NULL,
+            unvectorised_scrapes BIGINT NOT NULL
+        )
+        """,
+        """
+        CREATE OR REPLACE FUNCTION track_property_stats() RETURNS TRIGGER AS $$
+        DECLARE
+            d_count BIGINT := 0;
+            d_priced BIGINT := 0;
+            d_sum NUMERIC := 0;
+        BEGIN
+            IF TG_OP <> 'DELETE' THEN
+                SELECT COUNT(*), COUNT(price), COALESCE(SUM(price::NUMERIC), 0)
+                INTO d_count, d_priced, d_sum
+                FROM new_rows;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                SELECT d_count - COUNT(*), d_priced - COUNT(price), d_sum - COALESCE(SUM(price::NUMERIC), 0)
+                INTO d_count, d_priced, d_sum
+                FROM old_rows;
+            END IF;
+            -- don't lock the stats row for statements that changed nothing
+            IF d_count <> 0 OR d_priced <> 0 OR d_sum <> 0 THEN
+                UPDATE database_stats
+                SET total_properties = total_properties + d_count,
+                    priced_properties = priced_properties + d_priced,
+                    price_sum = price_sum + d_sum;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION track_scrape_stats() RETURNS TRIGGER AS $$
+        DECLARE
+            d_count BIGINT := 0;
+            d_unvectorised BIGINT := 0;
+        BEGIN
+            IF TG_OP <> 'DELETE' THEN
+                SELECT COUNT(*), COUNT(*) FILTER (WHERE vectorised = FALSE)
+                INTO d_count, d_unvectorised
+                FROM new_rows;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                SELECT d_count - COUNT(*), d_unvectorised - COUNT(*) FILTER (WHERE vectorised = FALSE)
+                INTO d_count, d_unvectorised
+                FROM old_rows;
+            END IF;
+            IF d_count <> 0 OR d_unvectorised <> 0 THEN
+                UPDATE database_stats
+                SET total_scrapes = total_scrapes + d_count,
+                    unvectorised_scrapes = unvectorised_scrapes + d_unvectorised;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        # transition tables only allow one event per trigger
+        """
+        CREATE TRIGGER properties_stats_insert AFTER INSERT ON properties
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION track_property_stats()
+        """,
+        """
+        CREATE TRIGGER properties_stats_update AFTER UPDATE ON properties
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION track_property_stats()
+        """,
+        """
+        CREATE TRIGGER properties_stats_delete AFTER DELETE ON properties
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION track_property_stats()
+        """,
+        """
+        CREATE TRIGGER scrape_history_stats_insert AFTER INSERT ON scrape_history
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION track_scrape_stats()
+        """,
+        """
+        CREATE TRIGGER scrape_history_stats_update AFTER UPDATE ON scrape_history
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION track_scrape_stats()
+        """,
+        """
+        CREATE TRIGGER scrape_history_stats_delete AFTER DELETE ON scrape_history
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION track_scrape_stats()
+        """,
+        # the triggers lock out writers until this migration commits, so
+        # the backfill can't miss concurrent changes
+        """
+        INSERT INTO database_stats (
+            total_properties, priced_properties, price_sum,
+            total_scrapes, unvectorised_scrapes
+        )
+        SELECT p.total, p.priced, p.price_sum, h.total, h.unvectorised
+        FROM (
+            SELECT COUNT(*) AS total, COUNT(price) AS priced,
+                   COALESCE(SUM(price::NUMERIC), 0) AS price_sum
+            FROM properties
+        ) p, (
+            SELECT COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE vectorised = FALSE) AS unvectorised
+            FROM scrape_history
+        ) h
+        """,
+        # Breakdowns for dashboards, refreshed by PropertyDatabase.refresh_stats
+        """
+        CREATE MATERIALIZED VIEW postcode_stats AS
+        SELECT
+            postcode,
+            COUNT(*) AS total_properties,
+            AVG(price) AS average_price,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS median_price
+        FROM properties
+        WHERE postcode IS NOT NULL
+        GROUP BY postcode
+        """,
+        "CREATE UNIQUE INDEX idx_postcode_stats_postcode ON postcode_stats(postcode)",
+        """
+        CREATE MATERIALIZED VIEW daily_scrape_stats AS
+        SELECT
+            scraped_at::DATE AS day,
+            COUNT(*) AS total_scrapes,
+            COUNT(DISTINCT property_id) AS properties_scraped
+        FROM scrape_history
+        GROUP BY scraped_at::DATE
+        """,
+        "CREATE UNIQUE INDEX idx_daily_scrape_stats_day ON daily_scrape_stats(day)",
+    ]),
+    (11, "embeddings version for query result caches", [
+        # bumped by every vectoriser batch, so a cache in any process can
+        # tell its results predate the latest write to the vector store
+        "ALTER TABLE database_stats ADD COLUMN embeddings_version BIGINT NOT NULL DEFAULT 0",
+    ]),
+    (12, "re-vectorise listings embedded without search metadata", [
+        # Vectors written before the search filters only carry embedded_at,
+        # so every where clause excludes them. Queue each property's latest
+        # scrape again; the vectoriser upserts the vector with full metadata.
+        # Properties with no scrapes left are covered by vectorise.py
+        # --backfill-metadata, which updates the metadata in Chroma directly.
+        """
+        UPDATE scrape_history sh
+        SET vectorised = FALSE
+        FROM (
+            SELECT DISTINCT ON (property_id) id, scraped_at
+            FROM scrape_history
+            ORDER BY property_id, scraped_at DESC, id DESC
+        ) latest
+        WHERE sh.id = latest.id
+          AND sh.scraped_at = latest.scraped_at
+          AND sh.vectorised
+        """,
+    ]),
+]
+
+# Exact statistics from the trigger-maintained database_stats row
+STATS_QUERY = """
+    SELECT
+        total_properties,
+        total_scrapes,
+        (price_sum / NULLIF(priced_properties, 0))::DOUBLE PRECISION AS average_price,
+        unvectorised_scrapes AS vectorisation_backlog
+    FROM database_stats
+"""
+
+EMBEDDINGS_VERSION_QUERY = "SELECT embeddings_version FROM database_stats"
+
+# Planner estimates from the last VACUUM/ANALYZE. Reads only the catalogs;
+# scrape_history and its partial index are summed over their partitions.
+APPROXIMATE_STATS_QUERY = """
+    SELECT
+        (SELECT GREATEST(reltuples, 0)::BIGINT FROM pg_class
+         WHERE oid = 'properties'::regclass) AS total_properties,
+        (SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::BIGINT
+         FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+         WHERE i.inhparent = 'scrape_history'::regclass) AS total_scrapes,
+        (SELECT (price_sum / NULLIF(priced_properties, 0))::DOUBLE PRECISION
+         FROM database_stats) AS average_price,
+        (SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::BIGINT
+         FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+         WHERE i.inhparent = 'idx_scrape_history_unvectorised'::regclass) AS vectorisation_backlog
+"""
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    Borrowers wait for a free connection instead of erroring when the pool
+    is exhausted, and connections that have gone bad are replaced. minconn
+    connections are opened up front; every connection returned in good
+    shape is kept for reuse, so up to maxconn stay open and warm.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, health_check: bool = False, timeout: float = None, **connect_kwargs):
+        self.connect_kwargs = connect_kwargs
+        self.health_check = health_check
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._idle = [self._connect() for _ in range(minconn)]
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        conn.autocommit = True
+        return conn
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError("Timed out waiting for a database connection")
+        try:
+            with self._lock:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                # most recently returned first, the least likely to have gone stale
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if not self._healthy(conn):
+                # Reconnect: drop the dead connection and open a new one
+                conn.close()
+                conn = self._connect()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close: bool = False):
+        try:
+            if not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            with self._lock:
+                keep = not (close or conn.closed or self._closed)
+                if keep:
+                    self._idle.append(conn)
+            if not keep and not conn.closed:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        """Close the idle connections; borrowed ones are closed when returned"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            if not conn.closed:
+                conn.close()
+
+    def _healthy(self, conn):
+        if conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        conn.autocommit = True
+        if self.health_check:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+            except psycopg2.Error:
+                return False
+        return True
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool():
+    """Process-wide pool shared by every PropertyDatabase with the same settings"""
+    connect_kwargs = dict(
+        database=os.getenv("PGNAME"),
+        user=os.getenv("PGUSER"),
+        password=os.getenv("PGPASSWORD"),
+        host="localhost",
+        port=os.getenv("SYSPGPORT")
+    )
+    key = tuple(sorted(connect_kwargs.items()))
+    with _pools_lock:
+        if key not in _pools:
+            timeout = os.getenv("PGPOOL_TIMEOUT")
+            # PGPOOL_MIN connections are opened when the pool is created;
+            # PGPOOL_MAX caps how many are open (and kept idle) at once
+            _pools[key] = ConnectionPool(
+                minconn=int(os.getenv("PGPOOL_MIN", 1)),
+                maxconn=int(os.getenv("PGPOOL_MAX", 10)),
+                health_check=os.getenv("PGPOOL_HEALTH_CHECK") == "true",
+                timeout=float(timeout) if timeout else None,
+                **connect_kwargs
+            )
+        return _pools[key]
+
+def close_pools():
+    """Close every pooled connection, e.g. at process shutdown"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+class PropertyDatabase:
+    def __init__(self, pool: ConnectionPool = None):
+        self.pool = pool or get_pool()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled (autocommit) connection for the duration of the block"""
+        conn = self.pool.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.pool.putconn(conn, close=broken)
+
+    @contextmanager
+    def cursor(self):
+        """Borrow a pooled connection and yield a cursor on it"""
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                yield cur
+
+    @contextmanager
+    def _transaction(self):
+        """Yield a cursor whose statements commit (or roll back) together"""
+        with self.connection() as conn:
+            conn.autocommit = False
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        yield cur
+            finally:
+                if not conn.closed:
+                    conn.autocommit = True
 
     def _init_schema_with_file_path(self):
         """Create tables if they don't exist"""
-        conn = self.connection
-        cur = conn.cursor()
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS properties (
-                property_id TEXT PRIMARY KEY,
-                price REAL,
-                bedrooms INTEGER,
-                bathrooms INTEGER,
-                carspaces INTEGER,
-                postcode INTEGER,
-                property_type TEXT,
-                state TEXT,
-                description TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS scrape_history (
-                id SERIAL PRIMARY KEY,
-                property_id TEXT NOT NULL,
-                scraped_at TIMESTAMP NOT NULL,
-                job_url TEXT NOT NULL,
-                vectorised BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (property_id) REFERENCES properties (property_id)
-            )
-        """)
-        
-        # Index for faster lookups
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_property_id 
-            ON scrape_history(property_id)
-        """)
+        return self.migrate()
+
+    def migrate(self):
+        """Apply any schema migrations this database hasn't seen yet.
+
+        Safe to call on every startup: applied versions are recorded in
+        schema_migrations, and an advisory lock stops two processes
+        starting at once from applying the same migration twice.
+        """
+        with self._transaction() as cur:
+            # CREATE TABLE IF NOT EXISTS isn't safe against a concurrent
+            # create either, so it runs under the lock too
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cur.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in cur.fetchall()}
+
+        newly_applied = []
+        for version, name, statements in MIGRATIONS:
+            if version in applied:
+                continue
+            with self._transaction() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cur.fetchone():
+                    continue
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+            print(f"Applied migration {version}: {name}")
+            newly_applied.append(version)
+        return newly_applied
 
     def upsert_property(self, property_data, scrape_metadata):
-        """Insert new property or update existing one"""
-        conn = self.connection
-        cur = conn.cursor()
-
-        # Check if property exists
-        cur.execute(
-            "SELECT property_id FROM properties WHERE property_id = %s",
-            (property_data["id"],)
-        )
-        exists = cur.fetchone() is not None
+        """Insert new property or update existing one.
 
-        if exists:
-            print("already exists", property_data)
+        Returns "created", "updated", or "unchanged" when the listing's
+        content hash matches what is already stored.
+        """
+        with self.cursor() as cur:
+            columns = list(PROPERTY_COLUMNS) + ["content_hash"]
+            values = [property_data[key] for key in PROPERTY_COLUMNS.values()]
+            values.append(content_fingerprint(property_data))
+
+            # Upsert and log the scrape in one statement. The update only fires
+            # when the content changed; unchanged scrapes are logged as already
+            # vectorised so downstream stages skip them.
+            cur.execute(f"""
+                WITH upserted AS (
+                    INSERT INTO properties ({", ".join(columns)})
+                    VALUES ({", ".join(["%s"] * len(columns))})
+                    ON CONFLICT (property_id) DO UPDATE
+                    SET {self._update_clause(columns)}
+                    WHERE properties.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                    RETURNING (xmax = 0) AS created
+                ), logged AS (
+                    INSERT INTO scrape_history (
+                        property_id, scraped_at, job_url, vectorised
+                    )
+                    SELECT %s, %s, %s, NOT EXISTS (SELECT 1 FROM upserted)
+                )
+                SELECT created FROM upserted
+            """, values + [
+                property_data["id"],
+                scrape_metadata["scraped_at"],
+                scrape_metadata["job_url"]
+            ])
 
-            # Fetch current listing using property_id
-            cur.execute(
-                "SELECT * FROM properties WHERE property_id = %s",
-                (property_data["id"],)
-            )
             row = cur.fetchone()
             if row is None:
-                raise RuntimeError("Record marked as exists but not found")
+                return "unchanged"
+            return "created" if row[0] else "updated"
 
-            # Convert row to dict
-            column_names = [desc[0] for desc in cur.description]
-            current_listing = dict(zip(column_names, row))
-
-            # Update overlapping fields except DB PK
-            update_fields = {
-                key: value
-                for key, value in property_data.items()
-                if key in current_listing and key != "id"
-            }
-
-            if update_fields:
-                set_clause = ", ".join(f"{key} = %s" for key in update_fields)
-                values = list(update_fields.values()) + [property_data["id"]]
-
-                sql = f"""
-                    UPDATE properties
-                    SET {set_clause}
-                    WHERE property_id = %s
-                """
-                cur.execute(sql, values)
-
-        else:
-            # Insert new property
+    def _update_clause(self, columns):
+        return ", ".join(
+            f"{col} = EXCLUDED.{col}" for col in columns if col != "property_id"
+        )
+
+    def upsert_properties(self, batch, log_unchanged: bool = True):
+        """Insert or update many properties in a single transaction.
+
+        `batch` is an iterable of (property_data, scrape_metadata) pairs, the
+        same arguments upsert_property takes. Returns created/updated/unchanged
+        counts. With log_unchanged=False only properties that were created or
+        updated get a scrape_history row, as when replaying archived pages.
+        """
+        batch = list(batch)
+        counts = {"created": 0, "updated": 0, "unchanged": 0}
+        if not batch:
+            return counts
+
+        # ON CONFLICT can't touch the same row twice in one statement,
+        # so keep only the latest listing for each property_id
+        latest = {}
+        for property_data, _ in batch:
+            latest[property_data["id"]] = property_data
+
+        columns = list(PROPERTY_COLUMNS) + ["content_hash"]
+        property_rows = [
+            tuple(property_data[key] for key in PROPERTY_COLUMNS.values())
+            + (content_fingerprint(property_data),)
+            for property_data in latest.values()
+        ]
+
+        with self._transaction() as cur:
+            written = execute_values(cur, f"""
+                INSERT INTO properties ({", ".join(columns)})
+                VALUES %s
+                ON CONFLICT (property_id) DO UPDATE
+                SET {self._update_clause(columns)}
+                WHERE properties.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                RETURNING property_id, (xmax = 0)
+            """, property_rows, page_size=len(property_rows), fetch=True)
+
+            changed = {property_id for property_id, _ in written}
+            history_rows = [
+                (
+                    property_data["id"],
+                    scrape_metadata["scraped_at"],
+                    scrape_metadata["job_url"],
+                    property_data["id"] not in changed
+                )
+                for property_data, scrape_metadata in batch
+                if log_unchanged or property_data["id"] in changed
+            ]
+            if history_rows:
+                execute_values(cur, """
+                    INSERT INTO scrape_history (
+                        property_id, scraped_at, job_url, vectorised
+                    ) VALUES %s
+                """, history_rows, page_size=len(history_rows))
+
+        for _, was_inserted in written:
+            counts["created" if was_inserted else "updated"] += 1
+        counts["unchanged"] = len(latest) - len(written)
+        return counts
+
+    @contextmanager
+    def claim_unvectorised(self, batch_size):
+        """Claim a batch of unvectorised scrapes, joined to their property.
+
+        The rows stay locked for the duration of the block and are skipped by
+        other workers. They're marked vectorised only if the block finishes
+        without raising, and the embeddings version is bumped with them;
+        otherwise the claim is released for another worker.
+        """
+        with self._transaction() as cur:
             cur.execute("""
-                INSERT INTO properties (
-                    property_id, price, bedrooms,
-                    bathrooms, carspaces, description, 
-                    property_type, state, postcode
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                property_data["id"],
-                property_data["price"],
-                property_data["bedrooms"],
-                property_data["bathrooms"],
-                property_data["carspaces"],
-                property_data["description"],
-                property_data["property_type"],
-                property_data["state"],
-                property_data["postcode"]
-            ))
-
-        # Always log the scrape
-        cur.execute("""
-            INSERT INTO scrape_history (
-                property_id, scraped_at, job_url
-            ) VALUES (%s, %s, %s)
-        """, (
-            property_data["id"],
-            scrape_metadata["scraped_at"],
-            scrape_metadata["job_url"]
-        ))
-
-        return "updated" if exists else "created"
+                SELECT sh.id AS history_id, p.*
+                FROM scrape_history sh
+                JOIN properties p ON p.property_id = sh.property_id
+                WHERE sh.vectorised = FALSE
+                ORDER BY sh.id
+                LIMIT %s
+                FOR UPDATE OF sh SKIP LOCKED
+            """, (batch_size,))
+            column_names = [desc[0] for desc in cur.description]
+            rows = [dict(zip(column_names, row)) for row in cur.fetchall()]
+
+            yield rows
+
+            if rows:
+                cur.execute(
+                    "UPDATE scrape_history SET vectorised = TRUE WHERE id = ANY(%s)",
+                    ([row["history_id"] for row in rows],)
+                )
+                cur.execute("UPDATE database_stats SET embeddings_version = embeddings_version + 1")
 
     def get_property(self, property_id):
         """Get a single property by ID"""
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM properties WHERE property_id = %s",
-            (property_id,)
-        )
-        row = cur.fetchone()
-        if row:
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT * FROM properties WHERE property_id = %s",
+                (property_id,)
+            )
+            row = cur.fetchone()
+            if row:
+                column_names = [desc[0] for desc in cur.description]
+                return dict(zip(column_names, row))
+            return None
+
+    def get_properties(self, property_ids):
+        """Get many properties by ID in one query, keyed by property_id"""
+        if not property_ids:
+            return {}
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT * FROM properties WHERE property_id = ANY(%s)",
+                (list(property_ids),)
+            )
+            rows = cur.fetchall()
             column_names = [desc[0] for desc in cur.description]
-            return dict(zip(column_names, row))
-        return None
+            properties = [dict(zip(column_names, row)) for row in rows]
+            return {p["property_id"]: p for p in properties}
 
     def get_all_properties(self):
         """Get all properties"""
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM properties ORDER BY updated_at DESC")
-        rows = cur.fetchall()
-        column_names = [desc[0] for desc in cur.description]
-        return [dict(zip(column_names, row)) for row in rows]
+        return list(self.iter_properties())
+
+    def iter_properties(self, chunk_size: int = 1000, columns: list = None):
+        """Stream properties, most recently updated first, in constant memory.
+
+        Pages with a keyset on (updated_at, property_id), so each chunk is an
+        index range scan no matter how deep into the table it is. `columns`
+        optionally limits which columns are returned.
+        """
+        select_list = self._projection(columns)
+        last_key = None
+        while True:
+            with self.cursor() as cur:
+                if last_key is None:
+                    cur.execute(f"""
+                        SELECT {select_list} FROM properties
+                        ORDER BY updated_at DESC, property_id DESC
+                        LIMIT %s
+                    """, (chunk_size,))
+                else:
+                    cur.execute(f"""
+                        SELECT {select_list} FROM properties
+                        WHERE (updated_at, property_id) < (%s, %s)
+                        ORDER BY updated_at DESC, property_id DESC
+                        LIMIT %s
+                    """, (*last_key, chunk_size))
+                rows = cur.fetchall()
+                column_names = [desc[0] for desc in cur.description]
+
+            if not rows:
+                return
+            chunk = [dict(zip(column_names, row)) for row in rows]
+            last_key = (chunk[-1]["updated_at"], chunk[-1]["property_id"])
+
+            for row in chunk:
+                if columns:
+                    row = {col: row[col] for col in columns}
+                yield row
+
+            if len(rows) < chunk_size:
+                return
+
+    def _projection(self, columns):
+        if not columns:
+            return "*"
+        unknown = set(columns) - PROPERTIES_TABLE_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown properties columns: {sorted(unknown)}")
+        # the keyset columns are always needed to fetch the next chunk
+        return ", ".join(dict.fromkeys(list(columns) + ["updated_at", "property_id"]))
 
     def get_scrape_history(self, property_id):
         """Get scrape history for a property"""
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT scraped_at, job_url 
-            FROM scrape_history 
-            WHERE property_id = %s
-            ORDER BY scraped_at DESC
-        """, (property_id,))
-        rows = cur.fetchall()
-        column_names = [desc[0] for desc in cur.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_stats(self):
-        """Get database statistics"""
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM properties")
-        total = cur.fetchone()[0]
-        cur.execute("SELECT COUNT(*) FROM scrape_history")
-        scrapes = cur.fetchone()[0]
-        cur.execute("SELECT AVG(price) FROM properties")
-        avg_price = cur.fetchone()[0]
-        return {
-            "total_properties": total,
-            "total_scrapes": scrapes,
-            "average_price": avg_price
-        }
-
-    def add_column(self, new_col: str, table_name: str):
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {new_col}")
+        with self.cursor() as cur:
+            cur.execute("""
+                SELECT scraped_at, job_url 
+                FROM scrape_history 
+                WHERE property_id = %s
+                ORDER BY scraped_at DESC
+            """, (property_id,))
+            rows = cur.fetchall()
+            column_names = [desc[0] for desc in cur.description]
+            return [dict(zip(column_names, row)) for row in rows]
+
+    def get_stats(self, approximate: bool = False):
+        """Get database statistics.
+
+        Reads the running totals kept by the database_stats triggers, so
+        this is a single-row lookup however big the tables get. With
+        approximate=True the counts come from the planner's estimates instead.
+        """
+        with self.cursor() as cur:
+            cur.execute(APPROXIMATE_STATS_QUERY if approximate else STATS_QUERY)
+            row = cur.fetchone()
+            column_names = [desc[0] for desc in cur.description]
+            return dict(zip(column_names, row))
+
+    def get_embeddings_version(self):
+        """Counter bumped whenever a vectoriser batch commits"""
+        with self.cursor() as cur:
+            cur.execute(EMBEDDINGS_VERSION_QUERY)
+            return cur.fetchone()[0]
+
+    def refresh_stats(self):
+        """Recompute the postcode_stats and daily_scrape_stats breakdowns.
+
+        CONCURRENTLY keeps the old contents readable while refreshing.
+        """
+        with self._transaction() as cur:
+            cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY postcode_stats")
+            cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY daily_scrape_stats")
+
+    def get_postcode_stats(self, postcodes: list = None):
+        """Property count, average and median price per postcode, as of the
+        last refresh_stats"""
+        with self.cursor() as cur:
+            if postcodes:
+                cur.execute("""
+                    SELECT * FROM postcode_stats
+                    WHERE postcode = ANY(%s)
+                    ORDER BY postcode
+                """, (list(postcodes),))
+            else:
+                cur.execute("SELECT * FROM postcode_stats ORDER BY postcode")
+            rows = cur.fetchall()
+            column_names = [desc[0] for desc in cur.description]
+            return [dict(zip(column_names, row)) for row in rows]
+
+    def get_daily_scrapes(self, days: int = 30):
+        """Scrapes per day over the last `days` days, as of the last
+        refresh_stats. Compacted or expired scrapes aren't counted."""
+        with self.cursor() as cur:
+            cur.execute("""
+                SELECT * FROM daily_scrape_stats
+                WHERE day > CURRENT_DATE - %s
+                ORDER BY day DESC
+            """, (days,))
+            rows = cur.fetchall()
+            column_names = [desc[0] for desc in cur.description]
+            return [dict(zip(column_names, row)) for row in rows]
 
     def delete_dupes(self):
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute("""
-            DELETE FROM scrape_history
-            WHERE id NOT IN (
-                SELECT MIN(id) AS id
-                FROM scrape_history
-                GROUP BY property_id
-            )
-        """)
+        """Keep only the latest scrape of each property"""
+        return self.compact_scrape_history()
+
+    def compact_scrape_history(self, batch_size: int = 500, progress=print):
+        """Roll duplicate scrapes into property_scrape_summary, a batch of
+        properties at a time.
+
+        Keeps the newest scrape of each property and deletes the rest, adding
+        them to the property's first_seen/last_seen/scrape_count. Each batch
+        is its own short transaction, so live crawls can keep inserting. If
+        any deleted scrape was still waiting to be vectorised, the kept one
+        is re-queued. Returns the totals.
+        """
+        totals = {"properties": 0, "deleted": 0}
+        last_property_id = ""
+        while True:
+            with self._transaction() as cur:
+                cur.execute("""
+                    SELECT property_id
+                    FROM scrape_history
+                    WHERE property_id > %s
+                    GROUP BY property_id
+                    HAVING COUNT(*) > 1
+                    ORDER BY property_id
+                    LIMIT %s
+                """, (last_property_id, batch_size))
+                property_ids = [row[0] for row in cur.fetchall()]
+                if not property_ids:
+                    break
+
+                cur.execute("""
+                    WITH ranked AS (
+                        SELECT id, property_id, scraped_at, vectorised,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY property_id
+                                   ORDER BY scraped_at DESC, id DESC
+                               ) AS rn
+                        FROM scrape_history
+                        WHERE property_id = ANY(%s)
+                    ), deleted AS (
+                        DELETE FROM scrape_history h
+                        USING ranked r
+                        WHERE h.id = r.id AND h.scraped_at = r.scraped_at AND r.rn > 1
+                        RETURNING h.property_id, h.scraped_at, h.vectorised
+                    ), summarised AS (
+                        INSERT INTO property_scrape_summary AS s (
+                            property_id, first_seen, last_seen, scrape_count
+                        )
+                        SELECT property_id, MIN(scraped_at), MAX(scraped_at), COUNT(*)
+                        FROM deleted
+                        GROUP BY property_id
+                        ON CONFLICT (property_id) DO UPDATE
+                        SET first_seen = LEAST(s.first_seen, EXCLUDED.first_seen),
+                            last_seen = GREATEST(s.last_seen, EXCLUDED.last_seen),
+                            scrape_count = s.scrape_count + EXCLUDED.scrape_count
+                    ), requeued AS (
+                        UPDATE scrape_history h
+                        SET vectorised = FALSE
+                        FROM ranked r
+                        WHERE h.id = r.id AND h.scraped_at = r.scraped_at
+                          AND r.rn = 1 AND h.vectorised
+                          AND EXISTS (
+                              SELECT 1 FROM ranked d
+                              WHERE d.property_id = r.property_id
+                                AND d.rn > 1 AND NOT d.vectorised
+                          )
+                    )
+                    SELECT COUNT(*) FROM deleted
+                """, (property_ids,))
+                deleted = cur.fetchone()[0]
+
+            last_property_id = property_ids[-1]
+            totals["properties"] += len(property_ids)
+            totals["deleted"] += deleted
+            if progress:
+                progress(f"Compacted {totals['properties']} properties, deleted {totals['deleted']} scrapes")
+
+        return totals
+
+    def maintain_partitions(self, months_ahead: int = 3):
+        """Make sure scrape_history has partitions for the coming months.
+
+        Older months that have scrapes sitting in the default partition get
+        partitions too, so apply_retention can expire them.
+        """
+        with self.cursor() as cur:
+            cur.execute("""
+                SELECT ensure_scrape_history_partitions(
+                    LEAST(LOCALTIMESTAMP, (SELECT MIN(scraped_at) FROM scrape_history_default)),
+                    %s
+                )
+            """, (months_ahead,))
+            return cur.fetchone()[0]
+
+    def apply_retention(self, keep_months: int, archive_dir: str = None, lock_timeout_ms: int = 1000):
+        """Drop scrape_history partitions older than keep_months.
+
+        Each partition's scrapes are rolled into property_scrape_summary
+        first, and if archive_dir is given the raw rows are saved there as
+        gzipped CSV. Returns the names of the dropped partitions.
+
+        The heavy reads happen under a SHARE lock on the expired partition
+        alone, so live scrapes (which land in newer partitions) and reads
+        carry on. The ACCESS EXCLUSIVE lock DETACH needs on scrape_history
+        is only taken at the end, for a moment; if it can't be had within
+        lock_timeout_ms the partition is left for the next run.
+        """
+        with self.cursor() as cur:
+            cur.execute("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'scrape_history'::regclass
+                  AND c.relname ~ '^scrape_history_p[0-9]{6}$'
+                  AND to_date(substring(c.relname from '[0-9]{6}$'), 'YYYYMM')
+                      < date_trunc('month', CURRENT_TIMESTAMP) - make_interval(months => %s)
+                ORDER BY c.relname
+            """, (keep_months,))
+            expired = [row[0] for row in cur.fetchall()]
+
+        dropped = []
+        for partition in expired:
+            name = sql.Identifier(partition)
+            try:
+                with self._transaction() as cur:
+                    cur.execute("SELECT set_config('lock_timeout', %s, true)", (f"{lock_timeout_ms}ms",))
+                    # freeze the partition's rows so the roll-up and the
+                    # stats adjustment match what gets dropped
+                    cur.execute(sql.SQL("LOCK TABLE {} IN SHARE MODE").format(name))
+                    if archive_dir:
+                        os.makedirs(archive_dir, exist_ok=True)
+                        with gzip.open(os.path.join(archive_dir, f"{partition}.csv.gz"), "wt") as file:
+                            cur.copy_expert(
+                                sql.SQL("COPY {} TO STDOUT WITH CSV HEADER").format(name),
+                                file
+                            )
+                    # one scan both rolls up the scrapes and counts them
+                    cur.execute(sql.SQL("""
+                        WITH rolled AS (
+                            SELECT property_id, MIN(scraped_at) AS first_seen,
+                                   MAX(scraped_at) AS last_seen, COUNT(*) AS total,
+                                   COUNT(*) FILTER (WHERE vectorised = FALSE) AS unvectorised
+                            FROM {}
+                            GROUP BY property_id
+                        ), summarised AS (
+                            INSERT INTO property_scrape_summary AS s (
+                                property_id, first_seen, last_seen, scrape_count
+                            )
+                            SELECT property_id, first_seen, last_seen, total
+                            FROM rolled
+                            ON CONFLICT (property_id) DO UPDATE
+                            SET first_seen = LEAST(s.first_seen, EXCLUDED.first_seen),
+                                last_seen = GREATEST(s.last_seen, EXCLUDED.last_seen),
+                                scrape_count = s.scrape_count + EXCLUDED.scrape_count
+                        )
+                        SELECT COALESCE(SUM(total), 0), COALESCE(SUM(unvectorised), 0)
+                        FROM rolled
+                    """).format(name))
+                    total, unvectorised = cur.fetchone()
+                    # Detach before touching database_stats: a vectoriser claim
+                    # holds scrape_history locks and then updates database_stats,
+                    # so taking them in the other order could deadlock with it
+                    cur.execute(sql.SQL("ALTER TABLE scrape_history DETACH PARTITION {}").format(name))
+                    # dropping a partition doesn't fire the DELETE trigger
+                    cur.execute("""
+                        UPDATE database_stats
+                        SET total_scrapes = total_scrapes - %s,
+                            unvectorised_scrapes = unvectorised_scrapes - %s
+                    """, (total, unvectorised))
+                    cur.execute(sql.SQL("DROP TABLE {}").format(name))
+            except (psycopg2.errors.LockNotAvailable, psycopg2.errors.DeadlockDetected):
+                print(f"Skipping scrape_history partition {partition}: still in use, retrying next run")
+                continue
+            print(f"Dropped scrape_history partition {partition}")
+            dropped.append(partition)
+
+        return dropped
 
     def test(self):
-        conn = self.connection
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM scrape_history")
-        print(cur.fetchall())
+        with self.cursor() as cur:
+            cur.execute("SELECT * FROM scrape_history")
+            print(cur.fetchall())
 
 
 if __name__ == "__main__":
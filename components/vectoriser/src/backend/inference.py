@@ -0,0 +1,107 @@
+# embedding_handling/inference.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from vectoriser.src.backend.vector_db_operations import (
+    cached_embeddings,
+    cached_result,
+    query_args,
+    remember_embeddings,
+    result_cache_key,
+)
+
+
+class BatchingEncoder:
+    """Encodes query text on a dedicated executor, off the event loop.
+
+    Requests that arrive within max_wait_ms of each other are merged into
+    a single model.encode call (up to max_batch_size texts), so concurrent
+    searches share one forward pass instead of queueing behind each other.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 2):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # batches run one at a time, so one thread is all the model needs
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._queue = None
+        self._worker = None
+
+    async def encode(self, texts: list):
+        """Embed texts, returning one list of floats per text"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(texts), future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.model.encode, texts)
+                if hasattr(embeddings, "tolist"):
+                    embeddings = embeddings.tolist()
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            start = 0
+            for item_texts, future in batch:
+                if not future.done():
+                    future.set_result(embeddings[start:start + len(item_texts)])
+                start += len(item_texts)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+
+async def query_embeddings_async(collection, query_texts: list, encoder: BatchingEncoder, n_results: int = 2, embedding_cache=None, result_cache=None, where: dict = None, version=None):
+    """
+    Async counterpart of query_embeddings: encodes through the batching
+    encoder and runs the Chroma query in a worker thread.
+    """
+    if not query_texts:
+        return None
+
+    result_key = result_cache_key(collection, query_texts, n_results, where, version)
+    result = cached_result(result_cache, result_key)
+    if result is not None:
+        return result
+
+    cached, missing = cached_embeddings(query_texts, embedding_cache)
+    if missing:
+        remember_embeddings(cached, missing, await encoder.encode(missing), embedding_cache)
+
+    result = await asyncio.to_thread(
+        collection.query,
+        **query_args([cached[text] for text in query_texts], n_results, where)
+    )
+
+    if result_cache is not None:
+        result_cache.set(result_key, result)
+    return result
@@ -5,21 +5,46 @@ import chromadb
 from chromadb.config import Settings
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import os
 import uvicorn
 
 from vectoriser.src.backend.vectorise import *                                                                                                 
-from vectoriser.src.backend.database_logic import PropertyDatabase
-from vectoriser.src.backend.vector_db_operations import store_embeddings, query_embeddings
+from vectoriser.src.backend.database_logic import PropertyDatabase, close_pools
+from vectoriser.src.backend.async_database_logic import AsyncPropertyDatabase
+from vectoriser.src.backend.vector_db_operations import store_embeddings, build_where
+from vectoriser.src.backend.query_cache import LRUCache
+from vectoriser.src.backend.inference import BatchingEncoder, query_embeddings_async
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CHROMA_DIR = PROJECT_ROOT / "src" / "backend" / "vector_database" / "chroma"
                                               
 app = FastAPI()
 
-model = get_model()
+model = engine
+
+encoder = BatchingEncoder(
+    model,
+    max_batch_size=int(os.getenv("ENCODE_MAX_BATCH", 32)),
+    max_wait_ms=float(os.getenv("ENCODE_MAX_WAIT_MS", 2))
+)
 
 client = get_client()
 
+embedding_cache = LRUCache(
+    maxsize=int(os.getenv("QUERY_CACHE_SIZE", 4096)),
+    ttl=float(os.getenv("QUERY_CACHE_TTL")) if os.getenv("QUERY_CACHE_TTL") else None
+)
+# Results are keyed on the database's embeddings version, which the
+# vectoriser bumps with every batch; the TTL only bounds memory use
+result_cache = LRUCache(
+    maxsize=int(os.getenv("RESULT_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", 300))
+)
+# How often the embeddings version is re-read, i.e. how long after a
+# vectoriser batch cached results from before it can still be served
+EMBEDDINGS_VERSION_REFRESH_SECONDS = float(os.getenv("EMBEDDINGS_VERSION_REFRESH_SECONDS", 2))
+
 
 origins = [
     "http://localhost:1704"
@@ -38,24 +63,103 @@ app.add_middleware(
 
 collection = get_collection(get_client(), "embeddings_storage")    
 
+async def hydrate_results(result, database: AsyncPropertyDatabase):
+    """Join a single-query Chroma result to its Postgres rows.
+
+    Fetches every hit in one query and returns the listings in rank order,
+    each with its vector distance. Hits missing from Postgres are dropped.
+    """
+    if not result or not result["ids"]:
+        return []
+    ids = result["ids"][0]
+    distances = result["distances"][0] if result.get("distances") else [None] * len(ids)
+
+    properties = await database.get_properties(ids)
+
+    listings = []
+    for property_id, distance in zip(ids, distances):
+        listing = properties.get(property_id)
+        if listing is None:
+            continue
+        listings.append({**listing, "distance": distance})
+    return listings
+
+async_db = None
+embeddings_version = None
+version_refresher = None
+
+async def refresh_embeddings_version():
+    """Keep embeddings_version current, off the request path"""
+    global embeddings_version
+    while True:
+        await asyncio.sleep(EMBEDDINGS_VERSION_REFRESH_SECONDS)
+        try:
+            embeddings_version = await async_db.get_embeddings_version()
+        except Exception as e:
+            print(f"Failed to refresh embeddings version: {e}")
+
+@app.on_event("startup")
+async def startup():
+    global async_db, embeddings_version, version_refresher
+    await asyncio.to_thread(PropertyDatabase().migrate)
+    async_db = await AsyncPropertyDatabase.connect()
+    embeddings_version = await async_db.get_embeddings_version()
+    version_refresher = asyncio.create_task(refresh_embeddings_version())
+
+@app.on_event("shutdown")
+async def shutdown():
+    if version_refresher is not None:
+        version_refresher.cancel()
+    await encoder.close()
+    if async_db is not None:
+        await async_db.close()
+    close_pools()
+
 @app.get("/retrieve/")
-def retrieve(term: str):
+async def retrieve(
+    term: str,
+    n_results: int = 10,
+    min_price: float = None,
+    max_price: float = None,
+    min_bedrooms: int = None,
+    max_bedrooms: int = None,
+    min_bathrooms: int = None,
+    min_carspaces: int = None,
+    postcode: int = None,
+    state: str = None,
+    property_type: str = None,
+):
     search_terms = [term] 
-    relevant_properties = query_embeddings(collection, search_terms, model, 10)       
-   
-    response = {}
-
-    
-    for field in relevant_properties:
-        i = 0
-        for value in property[field]:
-            response[f"property_{i}"] = {
-                    str(field): str(value)   
-                 }
-            i+=1                          
-
-
-    return response
+    where = build_where({
+        "min_price": min_price,
+        "max_price": max_price,
+        "min_bedrooms": min_bedrooms,
+        "max_bedrooms": max_bedrooms,
+        "min_bathrooms": min_bathrooms,
+        "min_carspaces": min_carspaces,
+        "postcode": postcode,
+        "state": state,
+        "property_type": property_type,
+    })
+    relevant_properties = await query_embeddings_async(
+        collection, search_terms, encoder, n_results,
+        embedding_cache=embedding_cache, result_cache=result_cache, where=where,
+        version=embeddings_version
+    )
+
+    listings = await hydrate_results(relevant_properties, async_db)
+    return {"results": listings}
+
+@app.get("/stats/")
+async def stats(approximate: bool = False):
+    return await async_db.get_stats(approximate=approximate)
+
+@app.get("/cache_stats/")
+def cache_stats():
+    return {
+        "embeddings": embedding_cache.stats(),
+        "results": result_cache.stats()
+    }
                                                                                        
     
 if __name__ == "__main__":
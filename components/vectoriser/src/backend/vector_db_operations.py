@@ -1,4 +1,5 @@
 # embedding_handling/db_operations.py
+import json
 from datetime import datetime
 
 def store_embeddings(collection, embeddings: list, documents: list, metadatas: list, ids: list):
@@ -9,7 +10,9 @@ def store_embeddings(collection, embeddings: list, documents: list, metadatas: l
         print("No embeddings to store.")
         return
 
-    collection.add(
+    # upsert rather than add so re-embedding a property (e.g. after a crash
+    # mid-run, or when its description changes) replaces the old vector
+    collection.upsert(
         embeddings=embeddings,
         documents=documents,
         metadatas=metadatas,
@@ -19,20 +22,136 @@ def store_embeddings(collection, embeddings: list, documents: list, metadatas: l
     print(f"Stored {len(embeddings)} embeddings in collection '{collection.name}'.")
 
 
-def query_embeddings(collection, query_texts: list, model, n_results: int = 2):
+def update_metadata(collection, metadatas: dict):
     """
-    Retrieve nearest embeddings for given query texts
+    Replace the metadata of listings already in the collection without
+    re-embedding them. metadatas maps id -> metadata; ids the collection
+    doesn't have are skipped, and each listing keeps its embedded_at.
+    Returns how many listings were updated.
+    """
+    if not metadatas:
+        return 0
+
+    existing = collection.get(ids=list(metadatas), include=["metadatas"])
+    ids = existing["ids"]
+    if not ids:
+        return 0
+
+    updated = []
+    for property_id, current in zip(ids, existing["metadatas"]):
+        metadata = dict(metadatas[property_id])
+        if current and current.get("embedded_at"):
+            metadata["embedded_at"] = current["embedded_at"]
+        updated.append(metadata)
+
+    collection.update(ids=ids, metadatas=updated)
+    return len(ids)
+
+
+# filter name -> (metadata field, Chroma operator)
+LISTING_FILTERS = {
+    "min_price": ("price", "$gte"),
+    "max_price": ("price", "$lte"),
+    "min_bedrooms": ("bedrooms", "$gte"),
+    "max_bedrooms": ("bedrooms", "$lte"),
+    "min_bathrooms": ("bathrooms", "$gte"),
+    "min_carspaces": ("carspaces", "$gte"),
+    "postcode": ("postcode", "$eq"),
+    "state": ("state", "$eq"),
+    "property_type": ("property_type", "$eq"),
+}
+
+
+def build_where(filters: dict):
+    """Turn listing filters into a Chroma where clause (None if no filters)"""
+    conditions = []
+    for name, value in (filters or {}).items():
+        if value is None:
+            continue
+        if name not in LISTING_FILTERS:
+            raise ValueError(f"Unknown filter: {name}")
+        field, operator = LISTING_FILTERS[name]
+        conditions.append({field: {operator: value}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def query_embeddings(collection, query_texts: list, model, n_results: int = 2, embedding_cache=None, result_cache=None, where: dict = None, version=None):
+    """
+    Retrieve nearest embeddings for given query texts, optionally restricted
+    to listings whose metadata matches a where clause (see build_where).
+
+    embedding_cache maps query text -> embedding; result_cache maps
+    (query texts, n_results, where, version) -> Chroma result. version should
+    be the database's embeddings version (get_embeddings_version), which every
+    vectoriser batch bumps, so results from before a write are never reused.
     """
     if not query_texts:
         return None
 
-    query_embeddings = [model.encode(text).tolist() for text in query_texts]
+    result_key = result_cache_key(collection, query_texts, n_results, where, version)
+    result = cached_result(result_cache, result_key)
+    if result is not None:
+        return result
 
-    result = collection.query(
-        query_embeddings=query_embeddings,
-        n_results=n_results
-    )
+    cached, missing = cached_embeddings(query_texts, embedding_cache)
+    if missing:
+        remember_embeddings(cached, missing, model.encode(missing), embedding_cache)
+
+    result = collection.query(**query_args([cached[text] for text in query_texts], n_results, where))
 
+    if result_cache is not None:
+        result_cache.set(result_key, result)
     return result
 
 
+def cached_result(result_cache, result_key):
+    """The cached Chroma result for result_key, or None"""
+    if result_cache is None:
+        return None
+    return result_cache.get(result_key)
+
+
+def cached_embeddings(query_texts: list, embedding_cache=None):
+    """Split query texts into the embeddings already cached (text -> embedding)
+    and the distinct texts that still need encoding"""
+    cached = {}
+    if embedding_cache is not None:
+        for text in query_texts:
+            embedding = embedding_cache.get(text)
+            if embedding is not None:
+                cached[text] = embedding
+
+    missing = [text for text in dict.fromkeys(query_texts) if text not in cached]
+    return cached, missing
+
+
+def remember_embeddings(cached: dict, texts: list, encoded, embedding_cache=None):
+    """Add freshly encoded embeddings to cached, and to embedding_cache"""
+    if hasattr(encoded, "tolist"):
+        encoded = encoded.tolist()
+    for text, embedding in zip(texts, encoded):
+        cached[text] = embedding
+        if embedding_cache is not None:
+            embedding_cache.set(text, embedding)
+
+
+def query_args(query_embeddings: list, n_results: int, where: dict = None):
+    args = {"query_embeddings": query_embeddings, "n_results": n_results}
+    if where:
+        args["where"] = where
+    return args
+
+
+def result_cache_key(collection, query_texts: list, n_results: int, where: dict = None, version=None):
+    return (
+        tuple(query_texts),
+        n_results,
+        json.dumps(where, sort_keys=True),
+        collection.name,
+        version
+    )
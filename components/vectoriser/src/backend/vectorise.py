@@ -1,4 +1,9 @@
 # embedding_handling/vectorise.py
+import argparse
+import multiprocessing
+import os
+from itertools import islice
+from functools import lru_cache
 from sentence_transformers import SentenceTransformer
 from datetime import datetime
 from pathlib import Path
@@ -6,15 +11,79 @@ import chromadb
 from chromadb.config import Settings
 
 from vectoriser.src.backend.database_logic import PropertyDatabase
-from vectoriser.src.backend.vector_db_operations import store_embeddings, query_embeddings
+from vectoriser.src.backend.vector_db_operations import store_embeddings, query_embeddings, update_metadata
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CHROMA_DIR = PROJECT_ROOT / "src" / "backend" / "vector_database" / "chroma"
 
-def get_model(model: str = "all-mpnet-base-v2"):
-    return SentenceTransformer(model)
+DEFAULT_MODEL = "all-mpnet-base-v2"
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+VECTORISE_CHUNK_SIZE = int(os.getenv("VECTORISE_CHUNK_SIZE", 512))
+VECTORISE_WORKERS = int(os.getenv("VECTORISE_WORKERS", 1))
+
+# properties columns copied into Chroma metadata, and their types
+METADATA_FIELDS = {
+    "price": float,
+    "bedrooms": int,
+    "bathrooms": int,
+    "carspaces": int,
+    "postcode": int,
+    "state": str,
+    "property_type": str,
+}
+
+def pick_device():
+    """Use EMBED_DEVICE if set, otherwise the best accelerator torch can see"""
+    device = os.getenv("EMBED_DEVICE")
+    if device:
+        return device
+
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+@lru_cache(maxsize=None)
+def get_model(model: str = DEFAULT_MODEL, device: str = None):
+    return SentenceTransformer(model, device=device or pick_device())
+
+class EmbeddingEngine:
+    """Long-lived wrapper that loads the model once and encodes in batches"""
+
+    def __init__(self, model: str = DEFAULT_MODEL, batch_size: int = EMBED_BATCH_SIZE, normalize: bool = False, device: str = None):
+        self.model_name = model
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.device = device
+
+    @property
+    def model(self):
+        return get_model(self.model_name, self.device)
+
+    def encode(self, texts: list, batch_size: int = None):
+        """Embed a list of texts, returning one list of floats per text"""
+        if not texts:
+            return []
+        embeddings = self.model.encode(
+            list(texts),
+            batch_size=batch_size or self.batch_size,
+            normalize_embeddings=self.normalize,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return embeddings.tolist()
+
+engine = EmbeddingEngine(normalize=os.getenv("EMBED_NORMALIZE") == "true")
 
 def get_client():
+    # Point parallel workers on other machines at a shared Chroma server
+    if os.getenv("CHROMA_HOST"):
+        return chromadb.HttpClient(
+            host=os.getenv("CHROMA_HOST"),
+            port=int(os.getenv("CHROMA_PORT", 8000))
+        )
     return chromadb.Client(
         Settings(is_persistent=True, persist_directory=str(CHROMA_DIR))
     )
@@ -33,64 +102,114 @@ collection = get_collection(get_client(), "embeddings_storage")
 db = PropertyDatabase() 
 
 def embed_text(text: str):
-    return get_model().encode(text).tolist()
-
-def main():
-    properties_to_vectorise = []
-
-    # Use the existing Postgres connection
-    conn = db.connection
-    cur = conn.cursor()
-
-    # Fetch unvectorised properties
-    cur.execute("SELECT * FROM scrape_history WHERE vectorised = 0")
-    results = cur.fetchall()
-    cur.execute("UPDATE scrape_history SET vectorised = 1 WHERE vectorised = 0")
-    if not results:
-        print("No unvectorised properties found.")
-        return
-
-    for entry in results:
-        property_id = entry[0]  # adjust index based on your table structure
-        cur.execute("SELECT * FROM properties WHERE property_id = %s", (property_id,))
-        row = cur.fetchone()
-        if row:
-            # convert row to dict if needed
-            colnames = [desc[0] for desc in cur.description]
-            properties_to_vectorise.append(dict(zip(colnames, row)))
-
-    if not properties_to_vectorise:
-        print("No properties found to vectorise.")
-        return
-
-    # Embed descriptions
-    descriptions = [p["description"] for p in properties_to_vectorise]
-    embedded_docs = [embed_text(desc) for desc in descriptions]
-    metadatas = [{"embedded_at": str(datetime.now())} for _ in properties_to_vectorise]
-    ids = [p["property_id"] for p in properties_to_vectorise]
+    return engine.encode([text])[0]
+
+def listing_metadata(property_row, embedded_at: str):
+    """Chroma metadata for a listing, so searches can filter on its attributes"""
+    metadata = {"embedded_at": embedded_at}
+    for field, cast in METADATA_FIELDS.items():
+        value = property_row.get(field)
+        # Chroma metadata can't hold nulls
+        if value is not None and value != "":
+            metadata[field] = cast(value)
+    return metadata
+
+def vectorise_rows(rows):
+    """Embed and store a batch of claimed scrapes in Chroma"""
+    # Several scrapes of one property only need embedding once
+    latest = {row["property_id"]: row for row in rows}
+    properties = list(latest.values())
+
+    descriptions = [p["description"] for p in properties]
+    embedded_docs = engine.encode(descriptions)
+    embedded_at = str(datetime.now())
+    metadatas = [listing_metadata(p, embedded_at) for p in properties]
+    ids = [p["property_id"] for p in properties]
 
     # Store in Chroma
     store_embeddings(collection, embedded_docs, descriptions, metadatas, ids)
+    return len(ids)
+
+def run_worker(batch_size: int = VECTORISE_CHUNK_SIZE):
+    """Claim, embed and acknowledge batches until the backlog is empty.
+
+    Any number of workers can run this against the same database, as long
+    as they share a Chroma server (CHROMA_HOST); a batch is only marked
+    vectorised after Chroma has accepted it, and a crashed worker's claim
+    is released back to the backlog.
+    """
+    total = 0
+    while True:
+        with db.claim_unvectorised(batch_size) as rows:
+            if not rows:
+                break
+            total += vectorise_rows(rows)
+        print(f"Vectorised {total} properties so far.")
+    return total
+
+def main(workers: int = VECTORISE_WORKERS, batch_size: int = VECTORISE_CHUNK_SIZE):
+    db.migrate()
+
+    if workers > 1 and not os.getenv("CHROMA_HOST"):
+        # every process would hold its own copy of the embedded store's
+        # index and the last to persist would win, losing acknowledged rows
+        print(f"Embedded Chroma can't take writes from {workers} processes; "
+              "running 1 worker. Set CHROMA_HOST to vectorise in parallel.")
+        workers = 1
+
+    if workers > 1:
+        # spawn, so each worker opens its own database connection and model
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            total = sum(pool.map(run_worker, [batch_size] * workers))
+    else:
+        total = run_worker(batch_size)
+
+    if not total:
+        print("No unvectorised properties found.")
+        return
 
-    # Mark properties as vectorised in Postgres
-    for pid in ids:
-        cur.execute("UPDATE scrape_history SET vectorised = 1 WHERE property_id = %s", (pid,))
-    conn.commit()
-
-    print(f"Vectorised and stored {len(ids)} properties.")
+    print(f"Vectorised and stored {total} properties.")
+
+def backfill_metadata(chunk_size: int = VECTORISE_CHUNK_SIZE):
+    """Bring the metadata of every vector in Chroma up to date with Postgres.
+
+    Vectors stored before the search filters only carry embedded_at, so
+    every filtered search misses them. This walks all properties, including
+    ones with no scrape history left, and updates the metadata in place;
+    nothing is re-embedded.
+    """
+    rows = db.iter_properties(chunk_size, columns=["property_id", *METADATA_FIELDS])
+    embedded_at = str(datetime.now())
+    total = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        total += update_metadata(collection, {
+            row["property_id"]: listing_metadata(row, embedded_at) for row in chunk
+        })
+        print(f"Updated metadata of {total} vectors so far.")
+    return total
 
 def search_embeddings(query_texts: list, n_results: int = 2):
-    return query_embeddings(collection, query_texts, get_model(), n_results=n_results)
+    return query_embeddings(collection, query_texts, engine, n_results=n_results)
 
 
 if __name__ == "__main__":
-    main()
-
-    # Example retrieval
-    query = "Looking for a rental property in a bustling part of Sydney"
-    results = search_embeddings([query], n_results=5)
-
-    print("Retrieved documents:", results['documents'])
-    print("IDs:", results['ids'])
-    print("Distances:", results['distances'])
-
+    parser = argparse.ArgumentParser(description="Embed unvectorised listings into Chroma")
+    parser.add_argument("--backfill-metadata", action="store_true", help="update the metadata of already stored vectors instead")
+    args = parser.parse_args()
+
+    if args.backfill_metadata:
+        db.migrate()
+        backfill_metadata()
+    else:
+        main()
+
+        # Example retrieval
+        query = "Looking for a rental property in a bustling part of Sydney"
+        results = search_embeddings([query], n_results=5)
+
+        print("Retrieved documents:", results['documents'])
+        print("IDs:", results['ids'])
+        print("Distances:", results['distances'])
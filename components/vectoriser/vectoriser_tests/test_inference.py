@@ -0,0 +1,130 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add components directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from vectoriser.src.backend.inference import BatchingEncoder, query_embeddings_async
+from vectoriser.src.backend.query_cache import LRUCache
+
+
+class FakeModel:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def encode(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+class FakeCollection:
+    name = "test"
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, **args):
+        self.queries.append(args)
+        return {"ids": [["1"]]}
+
+
+def test_concurrent_encodes_share_one_model_call():
+    """Test that requests arriving together are encoded in one batch"""
+    model = FakeModel()
+
+    async def run():
+        encoder = BatchingEncoder(model, max_wait_ms=50)
+        results = await asyncio.gather(
+            encoder.encode(["a"]),
+            encoder.encode(["bb", "ccc"]),
+            encoder.encode(["dddd"]),
+        )
+        await encoder.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+    assert model.calls == [["a", "bb", "ccc", "dddd"]]
+    print("✓ Concurrent encodes share one model call")
+
+
+def test_single_encode_returns_after_max_wait():
+    """Test that a lone request isn't held waiting for a full batch"""
+    model = FakeModel()
+
+    async def run():
+        encoder = BatchingEncoder(model, max_batch_size=32, max_wait_ms=20)
+        start = time.monotonic()
+        result = await encoder.encode(["a"])
+        elapsed = time.monotonic() - start
+        await encoder.close()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+
+    assert result == [[1.0]]
+    assert 0.02 <= elapsed < 1
+    assert model.calls == [["a"]]
+    print("✓ Single encode returns after max_wait_ms")
+
+
+def test_encode_error_reaches_every_waiter():
+    """Test that a failed batch fails every request in it"""
+    model = FakeModel(error=RuntimeError("out of memory"))
+
+    async def run():
+        encoder = BatchingEncoder(model, max_wait_ms=50)
+        results = await asyncio.gather(
+            encoder.encode(["a"]),
+            encoder.encode(["b"]),
+            return_exceptions=True,
+        )
+        await encoder.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert len(model.calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    print("✓ Encode errors reach every waiter")
+
+
+def test_query_embeddings_async_uses_caches():
+    """Test that cached embeddings and results skip the model and Chroma"""
+    model = FakeModel()
+    collection = FakeCollection()
+    embedding_cache, result_cache = LRUCache(), LRUCache()
+
+    async def run():
+        encoder = BatchingEncoder(model)
+        args = dict(embedding_cache=embedding_cache, result_cache=result_cache)
+        first = await query_embeddings_async(collection, ["a"], encoder, 5, version=1, **args)
+        again = await query_embeddings_async(collection, ["a"], encoder, 5, version=1, **args)
+        # a new embeddings version misses the result cache, not the embedding cache
+        newer = await query_embeddings_async(collection, ["a"], encoder, 5, version=2, **args)
+        await encoder.close()
+        return first, again, newer
+
+    first, again, newer = asyncio.run(run())
+
+    assert first == again == newer == {"ids": [["1"]]}
+    assert model.calls == [["a"]]
+    assert len(collection.queries) == 2
+    assert collection.queries[0] == {"query_embeddings": [[1.0]], "n_results": 5}
+    print("✓ query_embeddings_async uses the caches")
+
+if __name__ == "__main__":
+    test_concurrent_encodes_share_one_model_call()
+    test_single_encode_returns_after_max_wait()
+    test_encode_error_reaches_every_waiter()
+    test_query_embeddings_async_uses_caches()
+    print("\n✓✓✓ All inference tests passed")
@@ -0,0 +1,57 @@
+import sys
+import time
+from pathlib import Path
+
+# Add components directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from vectoriser.src.backend.query_cache import LRUCache
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the entry used longest ago is evicted first"""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    print("✓ Cache evicts the least recently used entry")
+
+
+def test_cache_expires_entries_after_ttl():
+    """Test that entries older than the TTL are dropped on lookup"""
+    cache = LRUCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.1)
+
+    assert cache.get("a", "expired") == "expired"
+    assert len(cache) == 0
+    print("✓ Cache expires entries after the TTL")
+
+
+def test_cache_stats_count_hits_and_misses():
+    """Test that stats report hits, misses and the hit rate"""
+    cache = LRUCache(maxsize=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 1
+    print("✓ Cache stats count hits and misses")
+
+if __name__ == "__main__":
+    test_cache_evicts_least_recently_used()
+    test_cache_expires_entries_after_ttl()
+    test_cache_stats_count_hits_and_misses()
+    print("\n✓✓✓ All LRUCache tests passed")
@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+# Add components directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from vectoriser.src.backend.query_cache import LRUCache
+from vectoriser.src.backend.vector_db_operations import build_where, query_embeddings, update_metadata
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+class FakeCollection:
+    name = "test"
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, **args):
+        self.queries.append(args)
+        return {"ids": [["1"]]}
+
+
+def test_build_where_without_filters():
+    """Test that no filters, or only unset ones, give no where clause"""
+    assert build_where({}) is None
+    assert build_where(None) is None
+    assert build_where({"min_price": None, "state": None}) is None
+    print("✓ build_where gives None without filters")
+
+
+def test_build_where_combines_filters():
+    """Test that one filter is used as is and several are ANDed"""
+    assert build_where({"max_price": 900}) == {"price": {"$lte": 900}}
+    assert build_where({"min_bedrooms": 2, "state": "NSW", "postcode": None}) == {
+        "$and": [{"bedrooms": {"$gte": 2}}, {"state": {"$eq": "NSW"}}]
+    }
+    print("✓ build_where combines filters")
+
+
+def test_build_where_rejects_unknown_filters():
+    """Test that a filter with no metadata field raises ValueError"""
+    try:
+        build_where({"garden": True})
+    except ValueError:
+        print("✓ build_where rejects unknown filters")
+        return
+    raise AssertionError("Expected ValueError for an unknown filter")
+
+
+def test_query_embeddings_only_encodes_uncached_texts():
+    """Test that repeated texts are encoded once and cached results reused"""
+    model = FakeModel()
+    collection = FakeCollection()
+    embedding_cache, result_cache = LRUCache(), LRUCache()
+    where = build_where({"state": "NSW"})
+
+    query_embeddings(collection, ["a"], model, 3, embedding_cache, result_cache, where, version=1)
+    result = query_embeddings(collection, ["a", "bb", "a"], model, 3, embedding_cache, result_cache, where, version=1)
+    query_embeddings(collection, ["a", "bb", "a"], model, 3, embedding_cache, result_cache, where, version=1)
+
+    assert result == {"ids": [["1"]]}
+    assert model.calls == [["a"], ["bb"]]
+    assert len(collection.queries) == 2
+    assert collection.queries[1] == {
+        "query_embeddings": [[1.0], [2.0], [1.0]],
+        "n_results": 3,
+        "where": {"state": {"$eq": "NSW"}},
+    }
+    assert query_embeddings(collection, [], model) is None
+    print("✓ query_embeddings only encodes uncached texts")
+
+
+def test_update_metadata_keeps_embedded_at():
+    """Test that stored vectors get new metadata and keep when they were embedded"""
+    class StoredCollection:
+        def __init__(self):
+            self.metadatas = {"1": {"embedded_at": "2025-01-01"}, "2": {"embedded_at": "2025-02-01"}}
+            self.updates = []
+
+        def get(self, ids, include):
+            found = [i for i in ids if i in self.metadatas]
+            return {"ids": found, "metadatas": [self.metadatas[i] for i in found]}
+
+        def update(self, ids, metadatas):
+            self.updates.append((ids, metadatas))
+
+    collection = StoredCollection()
+    updated = update_metadata(collection, {
+        "1": {"embedded_at": "now", "price": 650.0, "state": "NSW"},
+        "3": {"embedded_at": "now", "price": 400.0},
+    })
+
+    assert updated == 1
+    assert collection.updates == [(["1"], [{"embedded_at": "2025-01-01", "price": 650.0, "state": "NSW"}])]
+    assert update_metadata(collection, {}) == 0
+    print("✓ update_metadata keeps embedded_at")
+
+if __name__ == "__main__":
+    test_build_where_without_filters()
+    test_build_where_combines_filters()
+    test_build_where_rejects_unknown_filters()
+    test_query_embeddings_only_encodes_uncached_texts()
+    test_update_metadata_keeps_embedded_at()
+    print("\n✓✓✓ All vector_db_operations tests passed")